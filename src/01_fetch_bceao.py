@@ -1,15 +1,11 @@
-import requests
-from datetime import datetime
+from fetcher import fetch_conditional
 
 url = "https://www.bceao.int/fr/communique-presse"
 
-r = requests.get(url, timeout=30, headers={"User-Agent": "Mozilla/5.0"})
-r.raise_for_status()
+# Requête conditionnelle + stockage par contenu: une page inchangée ne crée aucun fichier
+path, changed = fetch_conditional(url, key="bceao_communique_presse", suffix=".html", as_text=True, timeout=30)
 
-ts = datetime.now().strftime("%Y%m%d_%H%M%S")
-filename = f"bceao_communique_presse_{ts}.html"
-
-with open(filename, "w", encoding="utf-8") as f:
-    f.write(r.text)
-
-print("Page BCEAO téléchargée :", filename)
+if changed:
+    print("Page BCEAO téléchargée :", path)
+else:
+    print("Page BCEAO inchangée, copie existante :", path)
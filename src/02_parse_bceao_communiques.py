@@ -1,13 +1,15 @@
-from bs4 import BeautifulSoup
 from urllib.parse import urljoin
 import pandas as pd
 import re
 
+import documents
+import raw_store
+
 BASE = "https://www.bceao.int"
-HTML_FILE = "bceao_communique_presse_20251218_044209.html"  # remplace par ton vrai fichier
+# Dernière page collectée par 01 (ancien fichier horodaté en repli)
+HTML_FILE = raw_store.latest("bceao_communique_presse", legacy_glob="bceao_communique_presse_*.html")
 
-with open(HTML_FILE, "r", encoding="utf-8") as f:
-    soup = BeautifulSoup(f.read(), "html.parser")
+soup = documents.parse_html(documents.load_html(HTML_FILE))
 
 rows = []
 for a in soup.select("a[href^='/fr/communique-presse/']"):
@@ -0,0 +1,176 @@
+from datetime import datetime
+import json
+from pathlib import Path
+from urllib.parse import urljoin, urlparse
+import re
+import pandas as pd
+
+import documents
+from fetcher import FETCH_WORKERS, fetch_many, fetch_many_conditional, print_change_report
+
+# Crawl incrémental des communiqués BCEAO (remplace 01 + 02 + 03 pour l'historique complet)
+# - backfill: parcourt toute la pagination; interrompu (erreur réseau), il reprend au run suivant
+#   à la page atteinte (curseur dans STATE_JSON) jusqu'à la fin de l'archive
+# - backfill terminé: s'arrête à la première page qui contient une URL déjà vue (1-2 pages)
+# - les pages détail des communiqués de politique monétaire sont téléchargées en parallèle
+
+BASE = "https://www.bceao.int"
+LISTING_URL = BASE + "/fr/communique-presse"
+MAX_PAGES = 300  # garde-fou
+
+OUT_CSV = Path("data/processed/bceao_communiques.csv")  # sert aussi de seen-set
+STATE_JSON = Path("data/processed/bceao_crawl_state.json")  # {"backfill_complete", "next_page"}
+
+MONETARY_PATTERN = re.compile(r"(comit[eé].*politique mon[eé]taire|politique mon[eé]taire|taux directeur|guichet de pr[eê]t marginal)", re.I)
+
+def page_url(page: int) -> str:
+    return LISTING_URL if page == 0 else f"{LISTING_URL}?page={page}"
+
+def parse_listing(html: str) -> list[dict]:
+    soup = documents.parse_html(html)
+    rows = []
+    seen = set()
+    for a in soup.select("a[href^='/fr/communique-presse/']"):
+        title = a.get_text(" ", strip=True)
+        href = a.get("href", "").strip()
+        url = urljoin(BASE, href)
+        if title and href and url not in seen:
+            seen.add(url)
+            rows.append({"title": title, "url": url})
+    return rows
+
+def raw_key(url: str) -> str:
+    """Clé raw_store d’un communiqué de politique monétaire: bceao_cpm_<slug>."""
+    return "bceao_cpm_" + urlparse(url).path.rstrip("/").rsplit("/", 1)[-1]
+
+def load_seen() -> pd.DataFrame:
+    if OUT_CSV.exists():
+        return pd.read_csv(OUT_CSV)
+    return pd.DataFrame(columns=["title", "url", "is_monetary_policy", "first_seen_at", "raw_key"])
+
+def load_state() -> dict:
+    if STATE_JSON.exists():
+        return json.loads(STATE_JSON.read_text(encoding="utf-8"))
+    return {"backfill_complete": False, "next_page": 0}
+
+def save_state(state: dict):
+    STATE_JSON.parent.mkdir(parents=True, exist_ok=True)
+    tmp = STATE_JSON.with_suffix(".tmp")
+    tmp.write_text(json.dumps(state), encoding="utf-8")
+    tmp.replace(STATE_JSON)
+
+def crawl_incremental(known: set, found: dict):
+    """Pages récentes jusqu'à la première URL connue. False si une page est en erreur."""
+    for p in range(MAX_PAGES):
+        res = fetch_many({p: page_url(p)}, timeout=30)[p]
+        if isinstance(res, Exception):
+            print(f"ERROR -> page {p}: {res!r}")
+            return False
+        rows = parse_listing(res.text)
+        new_rows = [r for r in rows if r["url"] not in known and r["url"] not in found]
+        for r in new_rows:
+            found[r["url"]] = r
+        print(f"Page {p}: {len(rows)} liens | nouveaux: {len(new_rows)}")
+        if not new_rows or any(r["url"] in known for r in rows):
+            return True
+    return True
+
+def crawl_backfill(known: set, found: dict, state: dict):
+    """
+    Toute la pagination à partir de state["next_page"], par lots de FETCH_WORKERS en parallèle.
+    Ne s'arrête pas sur une URL connue (reprise d'un backfill interrompu): seulement en fin
+    d'archive (page vide ou page répétée). Met à jour state (curseur / backfill_complete).
+    """
+    window = FETCH_WORKERS
+    page = state["next_page"]
+    previous = None
+
+    while page < MAX_PAGES:
+        batch = range(page, min(page + window, MAX_PAGES))
+        pages = fetch_many({p: page_url(p) for p in batch}, timeout=30)
+
+        for p in batch:
+            res = pages[p]
+            if isinstance(res, Exception):
+                print(f"ERROR -> page {p}: {res!r} | backfill repris à cette page au prochain run")
+                state["next_page"] = p
+                return
+
+            rows = parse_listing(res.text)
+            urls = {r["url"] for r in rows}
+            new_rows = [r for r in rows if r["url"] not in known and r["url"] not in found]
+            for r in new_rows:
+                found[r["url"]] = r
+            print(f"Page {p}: {len(rows)} liens | nouveaux: {len(new_rows)}")
+
+            # Fin de l'archive: page vide ou page identique à la précédente (pagination hors limite)
+            if not rows or urls == previous:
+                state.update(backfill_complete=True, next_page=0)
+                return
+            previous = urls
+
+        page += window
+
+    state.update(backfill_complete=True, next_page=0)
+
+def crawl_listing(known: set, state: dict) -> list[dict]:
+    """Communiqués inconnus: incrémental si le backfill est terminé, sinon backfill (repris au curseur)."""
+    found = {}
+    if state["backfill_complete"]:
+        crawl_incremental(known, found)
+        return list(found.values())
+
+    # Backfill repris: d'abord les nouveautés en tête de liste, puis la suite de l'archive
+    if state["next_page"] > 0 and known and not crawl_incremental(known, found):
+        return list(found.values())
+    crawl_backfill(known, found, state)
+    return list(found.values())
+
+def main():
+    seen_df = load_seen()
+    known = set(seen_df["url"].astype(str))
+    state = load_state()
+
+    print("\n=== CRAWL BCEAO communiqués (incrémental) ===\n")
+    mode = "incrémental" if state["backfill_complete"] else f"backfill (reprise page {state['next_page']})"
+    print("Déjà connus:", len(known), "| mode:", mode)
+
+    new_rows = crawl_listing(known, state)
+    save_state(state)
+
+    now = datetime.now().isoformat(timespec="seconds")
+    new_df = pd.DataFrame(new_rows, columns=["title", "url"])
+    new_df["is_monetary_policy"] = new_df["title"].apply(lambda x: bool(MONETARY_PATTERN.search(str(x))))
+    new_df["first_seen_at"] = now
+    new_df["raw_key"] = None
+
+    df = pd.concat([seen_df, new_df], ignore_index=True) if len(seen_df) else new_df
+    df["raw_key"] = df["raw_key"].astype(object)
+
+    # Pages détail (politique monétaire) en parallèle, stockées dans raw_store.
+    # Inclut les détails en erreur lors d'un run précédent (raw_key vide).
+    pending = df[df["is_monetary_policy"].astype(bool) & df["raw_key"].isna()]
+    if new_df.empty and pending.empty:
+        print("\nAucun nouveau communiqué.")
+        return
+
+    jobs = {raw_key(u): u for u in pending["url"]}
+    results = fetch_many_conditional(jobs, suffix=".html", as_text=True, timeout=30)
+
+    for key, res in results.items():
+        if isinstance(res, Exception):
+            print("ERROR ->", key, "|", repr(res))
+            continue
+        df.loc[df["url"] == jobs[key], "raw_key"] = key
+        print("OK ->", key, "=>", res[0])
+
+    if results:
+        print_change_report(results)
+
+    OUT_CSV.parent.mkdir(parents=True, exist_ok=True)
+    df.to_csv(OUT_CSV, index=False)
+
+    print(f"\nOK -> {OUT_CSV} | nouveaux: {len(new_df)} | détails politique monétaire: {len(jobs)}")
+
+if __name__ == "__main__":
+    main()
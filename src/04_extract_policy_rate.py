@@ -1,39 +1,25 @@
-from bs4 import BeautifulSoup
-import re
-from pathlib import Path
 import pandas as pd
 from datetime import datetime
 
-HTML_FILE = sorted(Path("data/raw").glob("bceao_cpm_20251203_*.html"))[-1]
+import cpm_rates
+import documents
+import macro_store
+import raw_store
 
-with open(HTML_FILE, "r", encoding="utf-8") as f:
-    soup = BeautifulSoup(f.read(), "html.parser")
+HTML_FILE = raw_store.latest("bceao_cpm_20251203", legacy_glob="data/raw/bceao_cpm_20251203_*.html")
 
-text = soup.get_text(" ", strip=True)
+# Résultat mémoïsé par contenu du communiqué + version des patterns (cpm_rates / extract_cache):
+# communiqué inchangé -> ni parsing HTML ni regex
+found = cpm_rates.extract_document_cached(HTML_FILE)["rates"]["policy_rate"]
 
-def to_float(x: str) -> float:
-    return float(x.replace(",", ".").strip())
-
-patterns = [
-    re.compile(r"principal\s+taux\s+directeur[^0-9]{0,80}([0-9]+(?:[.,][0-9]+)?)\s*%", re.IGNORECASE),
-    re.compile(r"maintenir\s+à\s*([0-9]+(?:[.,][0-9]+)?)\s*%[^.]{0,120}principal\s+taux\s+directeur", re.IGNORECASE),
-    re.compile(r"taux\s+minimum\s+de\s+soumission[^0-9]{0,80}([0-9]+(?:[.,][0-9]+)?)\s*%", re.IGNORECASE),
-]
-
-policy_rate = None
-matched_pattern = None
-for p in patterns:
-    m = p.search(text)
-    if m:
-        policy_rate = to_float(m.group(1))
-        matched_pattern = p.pattern
-        break
-
-if policy_rate is None:
-    idx = text.lower().find("taux")
-    snippet = text[max(0, idx-250): idx+400] if idx != -1 else text[:600]
+if found is None:
+    text = documents.html_text(HTML_FILE)
+    snippet = cpm_rates.context_snippet(text, "taux", before=250, after=400)
     raise ValueError("Taux directeur non trouvé. Extrait utile:\n" + snippet)
 
+policy_rate = found["value"]
+matched_pattern = found["pattern"]
+
 row = {
     "country": "UEMOA",
     "indicator": "Taux directeur BCEAO (principal)",
@@ -46,26 +32,15 @@ row = {
     "comment": f"CPM BCEAO (pattern: {matched_pattern})",
 }
 
-out_csv = Path("data/processed") / "macro_uemoa.csv"
-out_csv.parent.mkdir(parents=True, exist_ok=True)
-
 new_df = pd.DataFrame([row])
 
-# Upsert: clé = (country, indicator, date_reference)
-key_cols = ["country", "indicator", "date_reference"]
-
-if out_csv.exists():
-    old_df = pd.read_csv(out_csv)
-    # On enlève toute ligne existante avec la même clé, puis on ajoute la nouvelle
-    merged = pd.concat(
-        [old_df[~old_df[key_cols].astype(str).agg("|".join, axis=1).isin(
-            new_df[key_cols].astype(str).agg("|".join, axis=1)
-        )], new_df],
-        ignore_index=True
-    )
-    merged.to_csv(out_csv, index=False)
+# Upsert: clé = (country, indicator, date_reference), via l'index de macro_store
+store = macro_store.open_store()
+if store.unchanged([row]):
+    print("Aucun changement: ligne déjà présente dans", store.path)
 else:
-    new_df.to_csv(out_csv, index=False)
+    store.upsert([row])
+    store.save()
 
 print("OK -> Taux directeur (principal) enregistré :", policy_rate, "%")
 print(new_df.to_string(index=False))
@@ -1,44 +1,26 @@
-from bs4 import BeautifulSoup
-import re
-from pathlib import Path
 import pandas as pd
 from datetime import datetime
 
-# Prend le dernier communiqué CPM téléchargé
-HTML_FILE = sorted(Path("data/raw").glob("bceao_cpm_20251203_*.html"))[-1]
-
-with open(HTML_FILE, "r", encoding="utf-8") as f:
-    soup = BeautifulSoup(f.read(), "html.parser")
-
-text = soup.get_text(" ", strip=True)
-
-def to_float(x: str) -> float:
-    return float(x.replace(",", ".").strip())
-
-# Extraction du taux du guichet de prêt marginal
-patterns = [
-    re.compile(r"guichet\s+de\s+pr[eê]t\s+marginal[^0-9]{0,80}([0-9]+(?:[.,][0-9]+)?)\s*%", re.IGNORECASE),
-    # Variante fréquente : "taux du guichet de prêt marginal ... à 5,25%"
-    re.compile(r"taux\s+du\s+guichet\s+de\s+pr[eê]t\s+marginal[^0-9]{0,120}([0-9]+(?:[.,][0-9]+)?)\s*%", re.IGNORECASE),
-    # Variante inversée : "maintenir à 5,25% le taux du guichet de prêt marginal"
-    re.compile(r"maintenir\s+à\s*([0-9]+(?:[.,][0-9]+)?)\s*%[^.]{0,140}guichet\s+de\s+pr[eê]t\s+marginal", re.IGNORECASE),
-]
+import cpm_rates
+import documents
+import macro_store
+import raw_store
 
-marginal_rate = None
-matched_pattern = None
+# Prend le dernier communiqué CPM téléchargé
+HTML_FILE = raw_store.latest("bceao_cpm_20251203", legacy_glob="data/raw/bceao_cpm_20251203_*.html")
 
-for p in patterns:
-    m = p.search(text)
-    if m:
-        marginal_rate = to_float(m.group(1))
-        matched_pattern = p.pattern
-        break
+# Résultat mémoïsé par contenu du communiqué + version des patterns (cpm_rates / extract_cache):
+# communiqué inchangé -> ni parsing HTML ni regex
+found = cpm_rates.extract_document_cached(HTML_FILE)["rates"]["marginal_lending_rate"]
 
-if marginal_rate is None:
-    idx = text.lower().find("marginal")
-    snippet = text[max(0, idx-250): idx+500] if idx != -1 else text[:800]
+if found is None:
+    text = documents.html_text(HTML_FILE)
+    snippet = cpm_rates.context_snippet(text, "marginal", before=250, after=500)
     raise ValueError("Taux du guichet de prêt marginal non trouvé. Extrait utile:\n" + snippet)
 
+marginal_rate = found["value"]
+matched_pattern = found["pattern"]
+
 row = {
     "country": "UEMOA",
     "indicator": "Taux BCEAO (guichet de prêt marginal)",
@@ -51,23 +33,15 @@ row = {
     "comment": f"CPM BCEAO (pattern: {matched_pattern})",
 }
 
-out_csv = Path("data/processed") / "macro_uemoa.csv"
-out_csv.parent.mkdir(parents=True, exist_ok=True)
-
 new_df = pd.DataFrame([row])
 
-# Upsert pour éviter les doublons : clé = (country, indicator, date_reference)
-key_cols = ["country", "indicator", "date_reference"]
-
-if out_csv.exists():
-    old_df = pd.read_csv(out_csv)
-    old_keys = old_df[key_cols].astype(str).agg("|".join, axis=1)
-    new_keys = new_df[key_cols].astype(str).agg("|".join, axis=1)
-
-    merged = pd.concat([old_df[~old_keys.isin(new_keys)], new_df], ignore_index=True)
-    merged.to_csv(out_csv, index=False)
+# Upsert pour éviter les doublons : clé = (country, indicator, date_reference), via l'index de macro_store
+store = macro_store.open_store()
+if store.unchanged([row]):
+    print("Aucun changement: ligne déjà présente dans", store.path)
 else:
-    new_df.to_csv(out_csv, index=False)
+    store.upsert([row])
+    store.save()
 
 print("OK -> Taux prêt marginal enregistré :", marginal_rate, "%")
 print(new_df.to_string(index=False))
@@ -0,0 +1,108 @@
+import os
+import sys
+import pandas as pd
+from datetime import datetime
+
+import cpm_rates
+import documents
+import macro_store
+import raw_store
+import supervised
+
+# Tous les taux du communiqué CPM en un seul passage (remplace 04 + 05, ajoute les autres taux)
+# --backfill: tous les communiqués CPM stockés (raw_store "bceao_cpm_*", cf. 03b), en parallèle
+SOURCE_KEY = "bceao_cpm_20251203"
+DATE_REFERENCE = "2025-12-03"
+SOURCE_URL = "https://www.bceao.int/fr/communique-presse/reunion-ordinaire-du-comite-de-politique-monetaire-de-la-bceao-tenue-le-3"
+
+BACKFILL_PATTERN = "bceao_cpm_*"
+EXTRACT_WORKERS = int(os.environ.get("UEMOA_EXTRACT_WORKERS", str(os.cpu_count() or 1)))
+
+def rate_rows(rates: dict, date_ref: str, source_url: str, now: str) -> list[dict]:
+    rows = []
+    for name, res in rates.items():
+        if res is None:
+            continue
+        rows.append({
+            "country": "UEMOA",
+            "indicator": res["indicator"],
+            "value": res["value"],
+            "unit": res["unit"],
+            "date_reference": date_ref,
+            "source_name": "BCEAO",
+            "source_url": source_url,
+            "collected_at": now,
+            "comment": f"CPM BCEAO (pattern: {res['pattern']})",
+        })
+    return rows
+
+def run_latest(now: str) -> list[dict]:
+    entry = raw_store.latest_entry(SOURCE_KEY, legacy_glob=f"data/raw/{SOURCE_KEY}_*.html")
+    if entry is None:
+        raise FileNotFoundError(f"Communiqué CPM introuvable ({SOURCE_KEY}). Lance 03 d'abord.")
+
+    found = cpm_rates.extract_document_cached(entry["path"])["rates"]
+
+    for name, res in found.items():
+        if res is None:
+            print(f"NEEDS AUDIT -> {cpm_rates.SPECS_BY_NAME[name]['indicator']} non trouvé")
+
+    rows = rate_rows(found, DATE_REFERENCE, entry.get("url") or SOURCE_URL, now)
+    if not rows:
+        text = documents.html_text(entry["path"])
+        raise ValueError("Aucun taux CPM trouvé. Extrait utile:\n" + cpm_rates.context_snippet(text, "taux"))
+    return rows
+
+def run_backfill(now: str) -> list[dict]:
+    """Extraction sur tous les communiqués stockés, répartie sur EXTRACT_WORKERS processus.
+    Un processus par communiqué (supervised.py): un document en erreur ou bloqué est marqué
+    NEEDS AUDIT sans interrompre le backfill."""
+    entries = raw_store.entries(BACKFILL_PATTERN)
+    print(f"Backfill: {len(entries)} communiqué(s) | workers: {EXTRACT_WORKERS}")
+
+    results = supervised.run_supervised(
+        cpm_rates.extract_document_cached, {i: e["path"] for i, e in enumerate(entries)}, workers=EXTRACT_WORKERS
+    )
+
+    rows = []
+    for i, entry in enumerate(entries):
+        res = results[i]
+        if isinstance(res, Exception):
+            print(f"NEEDS AUDIT -> {entry['key']} | extraction interrompue ({res!r})")
+            continue
+        date_ref = res["date_reference"]
+        if not date_ref:
+            print(f"NEEDS AUDIT -> {entry['key']} | date de réunion introuvable")
+            continue
+        doc_rows = rate_rows(res["rates"], date_ref, entry.get("url") or "", now)
+        if not doc_rows:
+            print(f"SKIP -> {entry['key']} | aucun taux (communiqué hors décision de taux ?)")
+            continue
+        rows.extend(doc_rows)
+        print(f"OK -> {entry['key']} | {date_ref} | {len(doc_rows)} taux")
+    return rows
+
+def main():
+    backfill = "--backfill" in sys.argv[1:]
+    now = datetime.now().isoformat(timespec="seconds")
+
+    rows = run_backfill(now) if backfill else run_latest(now)
+    if not rows:
+        print("Aucune écriture effectuée.")
+        return
+
+    new_df = pd.DataFrame(rows)
+
+    # Une seule écriture pour tous les taux / toutes les réunions (index de macro_store: coût O(lot))
+    store = macro_store.open_store()
+    if store.unchanged(rows):
+        print("Aucun changement: taux déjà présents dans", store.path)
+        return
+    counts = store.upsert(rows)
+    store.save()
+
+    print(f"OK -> {len(new_df)} taux CPM enregistrés ({counts['inserted']} nouveaux, {counts['updated']} mis à jour)")
+    print(new_df[["indicator", "value", "unit", "date_reference"]].sort_values(["date_reference", "indicator"]).tail(12).to_string(index=False))
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,9 @@
+import csv
+import heapq
+import math
+import os
+import sys
+import tempfile
 import pandas as pd
 from pathlib import Path
 
@@ -5,25 +11,120 @@ from pathlib import Path
 PROJECT_ROOT = Path(__file__).resolve().parents[1]
 csv_path = PROJECT_ROOT / "data" / "processed" / "macro_uemoa.csv"
 
-if not csv_path.exists():
-    raise FileNotFoundError(f"Fichier introuvable : {csv_path}")
+key_cols = ["country", "indicator", "date_reference"]
 
-df = pd.read_csv(csv_path)
+# --chunked: dédoublonnage en mémoire bornée (gros historiques, petites VMs)
+# 1) lecture par blocs, lignes réparties par hachage de la clé dans des fichiers de débordement
+# 2) chaque partition (toutes les versions d'une même clé y sont) dédoublonnée en mémoire
+# 3) fusion k-voies des partitions triées: même fichier de sortie qu'en mode normal
+DEDUP_MEMORY_MB = int(os.environ.get("UEMOA_DEDUP_MEMORY_MB", "256"))
+MEMORY_PER_CSV_BYTE = 6  # octets pandas (object / str) par octet de CSV, estimation prudente
+MAX_PARTITIONS = 256     # fichiers ouverts en même temps pendant la fusion
 
-key_cols = ["country", "indicator", "date_reference"]
+TS_COL = "_ts"    # collected_at en entier (ns), NaT -> le plus ancien
+SEQ_COL = "_seq"  # rang de la ligne dans le fichier: à date égale, la dernière écrite gagne
+
+
+def collected_ts(df: pd.DataFrame):
+    # collected_at parsé comme vrai horodatage (et non trié comme texte)
+    # utc=True: valeurs avec fuseau (+02:00, Z) ramenées en UTC, valeurs naïves prises comme UTC
+    # (sinon "Mixed timezones detected"); non parsables -> NaT -> le plus ancien
+    if "collected_at" not in df.columns:
+        return pd.Series(0, index=df.index, dtype="int64")
+    ts = pd.to_datetime(df["collected_at"], format="ISO8601", errors="coerce", utc=True)
+    ts = ts.dt.tz_localize(None).astype("datetime64[ns]")
+    return pd.Series(ts.values.astype("int64"), index=df.index)
+
+
+def keep_last(df: pd.DataFrame) -> pd.DataFrame:
+    """Version la plus récente par clé (collected_at, puis ordre du fichier), triée comme en sortie."""
+    df = df.sort_values([TS_COL, SEQ_COL], kind="stable")
+    return df.drop_duplicates(subset=key_cols, keep="last")
+
+
+def dedup_in_memory(path: Path) -> tuple[int, int]:
+    # lu en texte: valeurs réécrites telles quelles (pas de 0.80 -> 0.8 ni 3 -> 3.0)
+    df = pd.read_csv(path, dtype=str, keep_default_na=False)
+    before = len(df)
+    df = keep_last(df.assign(**{TS_COL: collected_ts(df), SEQ_COL: range(len(df))}))
+    df.drop(columns=[TS_COL, SEQ_COL]).to_csv(path, index=False)
+    return before, len(df)
+
+
+def dedup_chunked(path: Path, memory_mb: int = DEDUP_MEMORY_MB) -> tuple[int, int]:
+    budget = memory_mb * 1024 * 1024
+    size = path.stat().st_size
+    n_parts = min(MAX_PARTITIONS, max(1, math.ceil(size * MEMORY_PER_CSV_BYTE / budget)))
+
+    # taille moyenne d'une ligne (premiers 64 Ko) -> blocs de lecture qui tiennent dans le budget
+    with open(path, "rb") as fh:
+        sample = fh.read(65536)
+    row_bytes = max(1, len(sample) // max(1, sample.count(b"\n")))
+    chunk_rows = max(1000, budget // (MEMORY_PER_CSV_BYTE * row_bytes * 2))
+
+    before = after = 0
+    with tempfile.TemporaryDirectory(prefix="dedup_", dir=path.parent) as spill_dir:
+        spill = [Path(spill_dir) / f"part-{i:04d}.csv" for i in range(n_parts)]
+
+        # 1) répartition par hachage de la clé (texte brut conservé tel quel)
+        for chunk in pd.read_csv(path, dtype=str, keep_default_na=False, chunksize=chunk_rows):
+            chunk[TS_COL] = collected_ts(chunk)
+            chunk[SEQ_COL] = range(before, before + len(chunk))
+            before += len(chunk)
+            part = pd.util.hash_pandas_object(chunk[key_cols], index=False).to_numpy() % n_parts
+            for i in set(part.tolist()):
+                out = spill[i]
+                chunk[part == i].to_csv(out, mode="a", header=not out.exists(), index=False)
+        if not before:
+            return 0, 0
+
+        # 2) dédoublonnage partition par partition (une seule en mémoire à la fois)
+        done = []
+        for p in spill:
+            if not p.exists():
+                continue
+            df = keep_last(pd.read_csv(p, dtype=str, keep_default_na=False).astype({TS_COL: "int64", SEQ_COL: "int64"}))
+            after += len(df)
+            out = p.with_name(p.stem + ".dedup.csv")
+            df.to_csv(out, index=False)
+            p.unlink()
+            done.append(out)
+
+        # 3) fusion k-voies en flux: une ligne par partition en mémoire
+        files = [open(p, newline="", encoding="utf-8") for p in done]
+        try:
+            readers = [csv.reader(f) for f in files]
+            header = [next(r) for r in readers][0]
+            ts_i, seq_i = header.index(TS_COL), header.index(SEQ_COL)
+            keep = [i for i, c in enumerate(header) if c not in (TS_COL, SEQ_COL)]
+
+            tmp = path.with_suffix(".tmp")
+            with open(tmp, "w", newline="", encoding="utf-8") as out:
+                writer = csv.writer(out, lineterminator=os.linesep)
+                writer.writerow([header[i] for i in keep])
+                for row in heapq.merge(*readers, key=lambda r: (int(r[ts_i]), int(r[seq_i]))):
+                    writer.writerow([row[i] for i in keep])
+        finally:
+            for f in files:
+                f.close()
+        tmp.replace(path)
+    return before, after
 
-# Trier pour garder la version la plus récente
-if "collected_at" in df.columns:
-    df = df.sort_values("collected_at")
 
-before = len(df)
+def main():
+    if not csv_path.exists():
+        raise FileNotFoundError(f"Fichier introuvable : {csv_path}")
 
-df = df.drop_duplicates(subset=key_cols, keep="last")
+    if "--chunked" in sys.argv[1:]:
+        print(f"Mode chunked: budget mémoire {DEDUP_MEMORY_MB} Mo (UEMOA_DEDUP_MEMORY_MB)")
+        before, after = dedup_chunked(csv_path)
+    else:
+        before, after = dedup_in_memory(csv_path)
 
-after = len(df)
+    print("OK -> macro_uemoa.csv dédoublonné")
+    print(f"Lignes avant : {before}")
+    print(f"Lignes après : {after}")
 
-df.to_csv(csv_path, index=False)
 
-print("OK -> macro_uemoa.csv dédoublonné")
-print(f"Lignes avant : {before}")
-print(f"Lignes après : {after}")
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,6 @@
-import requests
-from datetime import datetime
-from pathlib import Path
 import certifi
-import urllib3
 
-urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+from fetcher import fetch_many_conditional, print_change_report
 
 SOURCES = {
     "Senegal_ANSD_IHPC_annual": "https://www.ansd.sn/Indicateur/evolution-annuelle-de-lindice-harmonise-des-prix-la-consommation",
@@ -13,23 +9,24 @@ SOURCES = {
 
 NO_SSL_VERIFY = {"Senegal_ANSD_IHPC_annual"}
 
-out_dir = Path("data/raw/inflation")
-out_dir.mkdir(parents=True, exist_ok=True)
-
-headers = {"User-Agent": "Mozilla/5.0"}
-ts = datetime.now().strftime("%Y%m%d_%H%M%S")
+jobs = {
+    name: {
+        "url": url,
+        "verify": False if name in NO_SSL_VERIFY else certifi.where(),
+    }
+    for name, url in SOURCES.items()
+}
 
-for name, url in SOURCES.items():
-    try:
-        verify = False if name in NO_SSL_VERIFY else certifi.where()
-        r = requests.get(url, timeout=30, headers=headers, verify=verify)
-        r.raise_for_status()
+results = fetch_many_conditional(jobs, suffix=".html", as_text=True, timeout=30)
 
-        path = out_dir / f"{name}_{ts}.html"
-        path.write_text(r.text, encoding="utf-8")
+for name, res in results.items():
+    if isinstance(res, Exception):
+        print("ERROR ->", name, "|", SOURCES[name])
+        print("   ", repr(res))
+        continue
 
-        print("OK ->", name, "=>", path, "| ssl_verify =", verify)
+    path, changed = res
+    status = "OK" if changed else "UNCHANGED"
+    print(f"{status} ->", name, "=>", path, "| ssl_verify =", jobs[name]["verify"])
 
-    except Exception as e:
-        print("ERROR ->", name, "|", url)
-        print("   ", repr(e))
+print_change_report(results)
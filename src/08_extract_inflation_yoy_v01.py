@@ -1,40 +1,47 @@
-from bs4 import BeautifulSoup
 from pathlib import Path
-import re
-import pandas as pd
 from datetime import datetime
 
-RAW_DIR = Path("data/raw/inflation")
-OUT_CSV = Path("data/processed/macro_uemoa.csv")
-OUT_CSV.parent.mkdir(parents=True, exist_ok=True)
+import documents
+import extract_cache
+import macro_store
+import patterns
+import raw_store
 
-def upsert_macro(row: dict):
-    new_df = pd.DataFrame([row])
-    key_cols = ["country", "indicator", "date_reference"]
+RAW_DIR = Path("data/raw/inflation")
 
-    if OUT_CSV.exists():
-        old_df = pd.read_csv(OUT_CSV)
-        old_keys = old_df[key_cols].astype(str).agg("|".join, axis=1)
-        new_keys = new_df[key_cols].astype(str).agg("|".join, axis=1)
-        merged = pd.concat([old_df[~old_keys.isin(new_keys)], new_df], ignore_index=True)
-        merged.to_csv(OUT_CSV, index=False)
-    else:
-        new_df.to_csv(OUT_CSV, index=False)
+# Store chargé une fois (index par clé), les deux lignes sont écrites en un seul save() à la fin
+STORE = macro_store.open_store()
 
+def upsert_macro(row: dict):
+    if STORE.unchanged([row]):
+        print("INCHANGÉ ->", row["country"], row["indicator"], row["date_reference"], row["value"])
+        return
+    STORE.upsert([row])
     print("UPSERT OK ->", row["country"], row["indicator"], row["date_reference"], row["value"])
 
 def parse_number(x: str) -> float:
     return float(x.replace(",", ".").strip())
 
-# 1) Sénégal (ANSD) : on vise la phrase "Le taux d’inflation s’est établi à +0,8% en 2024"
-senegal_file = sorted(RAW_DIR.glob("Senegal_ANSD_IHPC_annual_*.html"))[-1]
-senegal_html = senegal_file.read_text(encoding="utf-8", errors="replace")
-senegal_text = BeautifulSoup(senegal_html, "html.parser").get_text(" ", strip=True)
+# Résultats mémoïsés par contenu de la page + version du pattern (extract_cache): page inchangée -> ni parsing ni regex
+TEXT_VERSION = (documents.HTML_PARSER, documents.TEXT_VERSION)
+
+def match_groups(pattern, path: Path):
+    m = pattern.search(documents.html_text(path))
+    return list(m.groups()) if m else None
 
-m = re.search(r"taux d[’']inflation\s+s[’']est\s+établi\s+à\s*([+\-]?\s*[0-9]+(?:[.,][0-9]+)?)\s*%\s+en\s+(20[0-9]{2})", senegal_text, flags=re.IGNORECASE)
+def extract_senegal(path: Path):
+    return match_groups(patterns.SEN_ANNUAL_INFLATION, path)
+
+def extract_civ(path: Path):
+    return match_groups(patterns.CIV_HOME_YOY, path)
+
+# 1) Sénégal (ANSD) : on vise la phrase "Le taux d’inflation s’est établi à +0,8% en 2024"
+senegal_file = raw_store.latest("Senegal_ANSD_IHPC_annual", legacy_glob=f"{RAW_DIR}/Senegal_ANSD_IHPC_annual_*.html")
+m = extract_cache.cached(senegal_file, "08.sen_annual_inflation",
+                         extract_cache.fingerprint(patterns.SEN_ANNUAL_INFLATION, TEXT_VERSION), extract_senegal)
 if m:
-    value = parse_number(m.group(1).replace("+", ""))
-    year = m.group(2)
+    value = parse_number(m[0].replace("+", ""))
+    year = m[1]
     upsert_macro({
         "country": "Sénégal",
         "indicator": "Inflation IHPC YoY",
@@ -50,15 +57,13 @@ else:
     print("Sénégal: motif inflation annuelle non trouvé. Il faudra ajuster le pattern.")
 
 # 2) Côte d’Ivoire (ANStat) : sur la home, il y a souvent "hausse de ...% en novembre 2025 par rapport à novembre 2024"
-civ_file = sorted(RAW_DIR.glob("CIV_ANStat_home_*.html"))[-1]
-civ_html = civ_file.read_text(encoding="utf-8", errors="replace")
-civ_text = BeautifulSoup(civ_html, "html.parser").get_text(" ", strip=True)
-
-m2 = re.search(r"IHPC[^.]{0,120}hausse\s+de\s*([+\-]?\s*[0-9]+(?:[.,][0-9]+)?)\s*%\s+en\s+([A-Za-zéûôîàç]+)\s+(20[0-9]{2})\s+par\s+rapport\s+à\s+\2\s+(20[0-9]{2})", civ_text, flags=re.IGNORECASE)
+civ_file = raw_store.latest("CIV_ANStat_home", legacy_glob=f"{RAW_DIR}/CIV_ANStat_home_*.html")
+m2 = extract_cache.cached(civ_file, "08.civ_home_yoy",
+                          extract_cache.fingerprint(patterns.CIV_HOME_YOY, TEXT_VERSION), extract_civ)
 if m2:
-    value = parse_number(m2.group(1).replace("+", ""))
-    month = m2.group(2)
-    year = m2.group(3)
+    value = parse_number(m2[0].replace("+", ""))
+    month = m2[1]
+    year = m2[2]
     # date_reference au format YYYY-MM (v0.1 : on conserve le mois en texte dans comment)
     upsert_macro({
         "country": "Côte d’Ivoire",
@@ -73,3 +78,5 @@ if m2:
     })
 else:
     print("Côte d’Ivoire: motif YoY non trouvé sur la home. On passera par la page Bulletin IHPC dédiée.")
+
+STORE.save()
@@ -1,9 +1,4 @@
-import requests
-from datetime import datetime
-from pathlib import Path
-import urllib3
-
-urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+from fetcher import fetch_many_conditional, print_change_report, ssl_verify
 
 # v0.1: URLs directes (on automatisera "dernier PDF" en v0.2)
 PDF_SOURCES = {
@@ -15,22 +10,21 @@ PDF_SOURCES = {
     "CIV_ANSTAT_IHPC_UEMOA_2025_06": "https://www.anstat.ci/assets/publications/files/File_val_indicateur1752229928.pdf",
 }
 
-# Chez toi, SSL casse pour ANSD/ANStat => exception contrôlée
-NO_SSL_VERIFY_DOMAINS = ("ansd.sn", "anstat.ci")
-
-out_dir = Path("data/raw/inflation/pdf")
-out_dir.mkdir(parents=True, exist_ok=True)
-
-headers = {"User-Agent": "Mozilla/5.0"}
-ts = datetime.now().strftime("%Y%m%d_%H%M%S")
+# SSL: exceptions par domaine gérées dans fetcher.NO_SSL_VERIFY_DOMAINS (ansd.sn, anstat.ci)
 
-for key, url in PDF_SOURCES.items():
-    verify = not any(d in url for d in NO_SSL_VERIFY_DOMAINS)
+# Stockage par contenu (raw_store): un PDF déjà connu n'est pas réécrit
+# stream=True: écriture par blocs, reprise (Range) si la connexion coupe
+results = fetch_many_conditional(PDF_SOURCES, suffix=".pdf", stream=True, timeout=60)
 
-    r = requests.get(url, timeout=60, headers=headers, verify=verify)
-    r.raise_for_status()
+for key, res in results.items():
+    if isinstance(res, Exception):
+        # retries déjà faits par le fetcher: on signale et on passe au PDF suivant
+        print("ERROR ->", key, "|", PDF_SOURCES[key])
+        print("   ", repr(res))
+        continue
 
-    out_path = out_dir / f"{key}_{ts}.pdf"
-    out_path.write_bytes(r.content)
+    out_path, changed = res
+    status = "OK" if changed else "UNCHANGED"
+    print(f"{status} ->", key, "=>", out_path, "| ssl_verify =", bool(ssl_verify(PDF_SOURCES[key])))
 
-    print("OK ->", key, "=>", out_path, "| ssl_verify =", verify)
+print_change_report(results)
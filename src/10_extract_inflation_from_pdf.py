@@ -1,64 +1,45 @@
 from pathlib import Path
 from datetime import datetime
-import re
-import pandas as pd
-import pdfplumber
-
-OUT_CSV = Path("data/processed/macro_uemoa.csv")
-OUT_CSV.parent.mkdir(parents=True, exist_ok=True)
-
-def upsert_macro(row: dict):
-    new_df = pd.DataFrame([row])
-    key_cols = ["country", "indicator", "date_reference"]
-
-    if OUT_CSV.exists():
-        old_df = pd.read_csv(OUT_CSV)
-        old_keys = old_df[key_cols].astype(str).agg("|".join, axis=1)
-        new_keys = new_df[key_cols].astype(str).agg("|".join, axis=1)
-        merged = pd.concat([old_df[~old_keys.isin(new_keys)], new_df], ignore_index=True)
-        merged.to_csv(OUT_CSV, index=False)
-    else:
-        new_df.to_csv(OUT_CSV, index=False)
 
+import macro_store
+import patterns
+import pdf_text
+import raw_store
+import supervised
+
+def upsert_macro(store: macro_store.MacroStore, row: dict):
+    store.upsert([row])
     print("UPSERT OK ->", row["country"], row["date_reference"], row["value"])
 
 def extract_text(pdf_path: Path) -> str:
-    chunks = []
-    with pdfplumber.open(pdf_path) as pdf:
-        for page in pdf.pages[:4]:  # on limite (souvent la phrase YoY est dans les 1ères pages)
-            t = page.extract_text() or ""
-            chunks.append(t)
-    return "\n".join(chunks)
+    # on limite (souvent la phrase YoY est dans les 1ères pages) ; texte via le cache pdf_text
+    return "\n".join(pdf_text.page_texts(pdf_path, max_pages=4))
 
 def parse_number(x: str) -> float:
     return float(x.replace(",", ".").replace("+", "").strip())
 
-# Patterns robustes: "en glissement annuel ... de X%" / "par rapport au même mois ... X%"
-PATTERNS = [
-    re.compile(r"glissement\s+annuel[^0-9+\-]{0,80}([+\-]?\s*[0-9]+(?:[.,][0-9]+)?)\s*%", re.IGNORECASE),
-    re.compile(r"variation\s+annuelle[^0-9+\-]{0,80}([+\-]?\s*[0-9]+(?:[.,][0-9]+)?)\s*%", re.IGNORECASE),
-    re.compile(r"par\s+rapport\s+au\s+m[êe]me\s+mois[^0-9+\-]{0,120}([+\-]?\s*[0-9]+(?:[.,][0-9]+)?)\s*%", re.IGNORECASE),
-]
+# Patterns robustes: "en glissement annuel ... de X%" / "par rapport au même mois ... X%" (cf. patterns.py)
+PATTERNS = patterns.PDF_YOY
 
 # v0.1: on fixe date_reference à partir du fichier choisi.
 # (En v0.2, on infère mois/année depuis le PDF)
 PDF_MAP = [
     {
-        "glob": "SEN_ANSD_IHPC_2024_12_*.pdf",
+        "key": "SEN_ANSD_IHPC_2024_12",
         "country": "Sénégal",
         "date_reference": "2024-12",
         "source_name": "ANSD",
         "source_url": "https://www.ansd.sn/sites/default/files/2025-01/IHPC_12_2024.pdf",
     },
     {
-        "glob": "CIV_ANSTAT_IHPC_2023_10_*.pdf",
+        "key": "CIV_ANSTAT_IHPC_2023_10",
         "country": "Côte d’Ivoire",
         "date_reference": "2023-10",
         "source_name": "ANStat",
         "source_url": "https://www.anstat.ci/assets/publications/files/ihpc1023.pdf",
     },
     {
-        "glob": "CIV_ANSTAT_IHPC_UEMOA_2025_06_*.pdf",
+        "key": "CIV_ANSTAT_IHPC_UEMOA_2025_06",
         "country": "Côte d’Ivoire",
         "date_reference": "2025-06",
         "source_name": "ANStat",
@@ -68,40 +49,58 @@ PDF_MAP = [
 
 pdf_dir = Path("data/raw/inflation/pdf")
 
-for meta in PDF_MAP:
-    matches = sorted(pdf_dir.glob(meta["glob"]))
-    if not matches:
-        print("SKIP -> PDF introuvable pour", meta["country"], meta["glob"])
-        continue
-
-    pdf_path = matches[-1]
+def find_yoy(pdf_path: Path):
+    """(valeur, pattern, extrait) ; valeur None si aucun pattern ne matche. Tourne dans un worker supervisé."""
     text = extract_text(pdf_path)
-
-    yoy = None
-    used = None
     for p in PATTERNS:
         m = p.search(text)
         if m:
-            yoy = parse_number(m.group(1))
-            used = p.pattern
-            break
-
-    if yoy is None:
-        snippet = text[:1200]
-        print("FAIL -> YoY non trouvé dans", pdf_path.name)
-        print("Extrait utile:\n", snippet)
-        continue
-
-    row = {
-        "country": meta["country"],
-        "indicator": "Inflation IHPC YoY",
-        "value": yoy,
-        "unit": "%",
-        "date_reference": meta["date_reference"],
-        "source_name": meta["source_name"],
-        "source_url": meta["source_url"],
-        "collected_at": datetime.now().isoformat(timespec="seconds"),
-        "comment": f"Extraction PDF v0.1 (pattern: {used}) | file: {pdf_path.name}",
-    }
-
-    upsert_macro(row)
+            return parse_number(m.group(1)), p.pattern, None
+    return None, None, text[:1200]
+
+def main():
+    jobs = {}
+    for i, meta in enumerate(PDF_MAP):
+        pdf_path = raw_store.latest(meta["key"], legacy_glob=f"{pdf_dir}/{meta['key']}_*.pdf")
+        if pdf_path is None:
+            print("SKIP -> PDF introuvable pour", meta["country"], meta["key"])
+            continue
+        jobs[i] = pdf_path
+
+    # Un processus par PDF, avec délai et plafond mémoire (cf. supervised.py):
+    # un PDF qui bloque pdfplumber ne bloque plus le run
+    results = supervised.run_supervised(find_yoy, jobs)
+
+    store = macro_store.open_store()
+
+    for i, pdf_path in jobs.items():
+        meta = PDF_MAP[i]
+        if isinstance(results[i], Exception):
+            print(f"NEEDS AUDIT -> {meta['country']} {meta['date_reference']} | extraction interrompue ({results[i]!r}) | file: {pdf_path.name}")
+            continue
+
+        yoy, used, snippet = results[i]
+        if yoy is None:
+            print("FAIL -> YoY non trouvé dans", pdf_path.name)
+            print("Extrait utile:\n", snippet)
+            continue
+
+        row = {
+            "country": meta["country"],
+            "indicator": "Inflation IHPC YoY",
+            "value": yoy,
+            "unit": "%",
+            "date_reference": meta["date_reference"],
+            "source_name": meta["source_name"],
+            "source_url": meta["source_url"],
+            "collected_at": datetime.now().isoformat(timespec="seconds"),
+            "comment": f"Extraction PDF v0.1 (pattern: {used}) | file: {pdf_path.name}",
+        }
+
+        upsert_macro(store, row)
+
+    # Une seule écriture pour tous les PDFs
+    store.save()
+
+if __name__ == "__main__":
+    main()
@@ -1,16 +1,14 @@
 from pathlib import Path
-import pdfplumber
 import re
 
+import patterns
+import pdf_text
+import raw_store
+
 PDF_DIR = Path("data/raw/inflation/pdf")
 
 def extract_text(pdf_path: Path) -> str:
-    text = []
-    with pdfplumber.open(pdf_path) as pdf:
-        for page in pdf.pages[:8]:
-            t = page.extract_text()
-            if t:
-                text.append(t)
+    text = [t for t in pdf_text.page_texts(pdf_path, max_pages=8) if t]
     joined = " ".join(text)
     joined = re.sub(r"\s+", " ", joined).strip()
     return joined
@@ -18,23 +16,18 @@ def extract_text(pdf_path: Path) -> str:
 TARGETS = [
     {
         "country": "Sénégal",
-        "glob": "SEN_ANSD_IHPC_2024_12_*.pdf",
-        "patterns": [
-            re.compile(
-                r"(taux\s+d[’']inflation[^.]{0,200}?s[’']établit\s+à\s*[+\-]?\s*[0-9]+(?:[.,][0-9]+)?\s*%)",
-                re.IGNORECASE
-            )
-        ],
+        "key": "SEN_ANSD_IHPC_2024_12",
+        "patterns": [patterns.AUDIT_SEN_INFLATION],
         "fallback_context": "inflation"
     },
     {
         "country": "Côte d’Ivoire",
-        "glob": "CIV_ANSTAT_IHPC_UEMOA_2025_06_*.pdf",
+        "key": "CIV_ANSTAT_IHPC_UEMOA_2025_06",
         "patterns": [
             # Attention: ce PDF contient aussi un glissement annuel énergie (-7,1%).
             # L'audit automatique peut tomber dessus: on garde l'audit manuel comme vérité métier.
-            re.compile(r"(IHPC[^.]{0,400}?glissement\s+annuel[^.]{0,300}?[+\-]?\s*[0-9]+(?:[.,][0-9]+)?\s*%)", re.IGNORECASE),
-            re.compile(r"(glissement\s+annuel[^.]{0,220}?[+\-]?\s*[0-9]+(?:[.,][0-9]+)?\s*%)", re.IGNORECASE),
+            patterns.AUDIT_CIV_IHPC_GLISSEMENT,
+            patterns.AUDIT_CIV_GLISSEMENT,
         ],
         "fallback_context": "glissement annuel"
     }
@@ -43,12 +36,11 @@ TARGETS = [
 print("\n=== AUDIT INFLATION : PHRASES (ne modifie pas le CSV) ===\n")
 
 for t in TARGETS:
-    matches = sorted(PDF_DIR.glob(t["glob"]))
-    if not matches:
+    pdf_path = raw_store.latest(t["key"], legacy_glob=f"{PDF_DIR}/{t['key']}_*.pdf")
+    if pdf_path is None:
         print(f"[{t['country']}] PDF introuvable")
         continue
 
-    pdf_path = matches[-1]
     text = extract_text(pdf_path)
 
     print(f"\n--- {t['country']} | fichier : {pdf_path.name} ---")
@@ -1,14 +1,17 @@
 from pathlib import Path
 import re
-import pdfplumber
+
+import patterns
+import pdf_text
+import raw_store
+import text_index
 
 PDF_DIR = Path("data/raw/inflation/pdf")
 
 # Prend le dernier PDF CI juin 2025
-pdf_files = sorted(PDF_DIR.glob("CIV_ANSTAT_IHPC_UEMOA_2025_06_*.pdf"))
-if not pdf_files:
-    raise FileNotFoundError("PDF CI juin 2025 introuvable dans data/raw/inflation/pdf")
-PDF_PATH = pdf_files[-1]
+PDF_PATH = raw_store.latest("CIV_ANSTAT_IHPC_UEMOA_2025_06", legacy_glob=f"{PDF_DIR}/CIV_ANSTAT_IHPC_UEMOA_2025_06_*.pdf")
+if PDF_PATH is None:
+    raise FileNotFoundError("PDF CI juin 2025 introuvable (raw_store / data/raw/inflation/pdf)")
 
 def normalize(text: str) -> str:
     text = text or ""
@@ -16,12 +19,7 @@ def normalize(text: str) -> str:
     return text.strip()
 
 def extract_full_text(pdf_path: Path) -> str:
-    chunks = []
-    with pdfplumber.open(pdf_path) as pdf:
-        for page in pdf.pages:  # toutes les pages
-            t = page.extract_text()
-            if t:
-                chunks.append(t)
+    chunks = [t for t in pdf_text.page_texts(pdf_path) if t]  # toutes les pages
     return normalize(" ".join(chunks))
 
 text = extract_full_text(PDF_PATH)
@@ -29,32 +27,23 @@ text = extract_full_text(PDF_PATH)
 # 1) Pattern "IHPC + verbe + (baisse|hausse) + %", plus strict que "glissement annuel"
 # On accepte plusieurs écritures: Indice Harmonisé..., IHPC, etc.
 PATTERNS = [
-    re.compile(
-        r"((?:Indice\s+Harmonisé\s+des\s+Prix\s+à\s+la\s+Consommation\s*\(IHPC\)|IHPC)[^.]{0,300}?"
-        r"(?:enregistre|affiche|présente|observe|marque|connait|connaît)[^.]{0,200}?"
-        r"(?:une\s+)?(baisse|hausse)[^.]{0,200}?"
-        r"([+\-]?\s*[0-9]+(?:[.,][0-9]+)?)\s*%)",
-        re.IGNORECASE
-    ),
+    patterns.V14_IHPC_VERB,
     # Variante: "... en glissement annuel" parfois avant la valeur
-    re.compile(
-        r"((?:Indice\s+Harmonisé\s+des\s+Prix\s+à\s+la\s+Consommation\s*\(IHPC\)|IHPC)[^.]{0,400}?"
-        r"glissement\s+annuel[^.]{0,200}?"
-        r"(?:une\s+)?(baisse|hausse)[^.]{0,200}?"
-        r"([+\-]?\s*[0-9]+(?:[.,][0-9]+)?)\s*%)",
-        re.IGNORECASE
-    ),
+    patterns.V14_IHPC_GLISSEMENT,
 ]
 
 # 2) Filtres anti-faux-positifs (énergie, sous-indices)
-EXCLUDE = re.compile(r"\b(énergie|energie|poste\s+énergie|divisions?|sous[-\s]?indice|transport|aliments?)\b", re.IGNORECASE)
+EXCLUDE = patterns.V14_EXCLUDE
 
 print("\n=== TEST EXTRACTION IHPC GLOBAL (sans OCR) ===")
 print("PDF:", PDF_PATH.name)
 
+# Phrases candidates ("IHPC" et "baisse"/"hausse"): les patterns ne tournent que là
+index = text_index.SentenceIndex(text)
+
 found = False
 for p in PATTERNS:
-    for m in p.finditer(text):
+    for m in index.finditer(p, *text_index.IHPC_GROUPS):
         phrase = m.group(1)
         direction = m.group(2).lower()
         value_raw = m.group(3)
@@ -1,32 +1,11 @@
-from pathlib import Path
 from datetime import datetime
-import pandas as pd
 
-OUT_CSV = Path("data/processed/macro_uemoa.csv")
+import macro_store
 
-def load_df():
-    if OUT_CSV.exists():
-        return pd.read_csv(OUT_CSV)
-    return pd.DataFrame()
-
-def save_df(df: pd.DataFrame):
-    OUT_CSV.parent.mkdir(parents=True, exist_ok=True)
-    df.to_csv(OUT_CSV, index=False)
-
-def upsert(df: pd.DataFrame, row: dict) -> pd.DataFrame:
-    new_df = pd.DataFrame([row])
-    key_cols = ["country", "indicator", "date_reference"]
-    if df.empty:
-        return new_df
-    old_keys = df[key_cols].astype(str).agg("|".join, axis=1)
-    new_keys = new_df[key_cols].astype(str).agg("|".join, axis=1)
-    return pd.concat([df[~old_keys.isin(new_keys)], new_df], ignore_index=True)
-
-df = load_df()
+store = macro_store.open_store()
 
 # Purge des lignes de test (mauvaises extractions)
-if not df.empty and "indicator" in df.columns:
-    df = df[df["indicator"].astype(str) != "Inflation IHPC YoY"].copy()
+store.delete_where(indicator="Inflation IHPC YoY")
 
 now = datetime.now().isoformat(timespec="seconds")
 
@@ -42,7 +21,7 @@ row_sen = {
     "collected_at": now,
     "comment": "Audit phrase: taux d’inflation annuel en 2024 s’établit à +0,8% (PDF IHPC décembre 2024).",
 }
-df = upsert(df, row_sen)
+store.upsert([row_sen])
 
 # Côte d’Ivoire (officiel, audit manuel)
 row_civ = {
@@ -56,9 +35,9 @@ row_civ = {
     "collected_at": now,
     "comment": "Audit manuel: IHPC global enregistre une baisse (-0,6%) en glissement annuel (juin 2025). Note: -7,1% concerne l'énergie (sous-indice).",
 }
-df = upsert(df, row_civ)
+store.upsert([row_civ])
 
-save_df(df)
+store.save()
 
 print("OK -> macro_uemoa.csv mis à jour (officiel) + purge tests.")
-print(df.sort_values(["country", "indicator", "date_reference"]).to_string(index=False))
+print(store.frame().sort_values(["country", "indicator", "date_reference"]).to_string(index=False))
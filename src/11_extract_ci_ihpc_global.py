@@ -1,11 +1,14 @@
 from pathlib import Path
 from datetime import datetime
 import re
-import pandas as pd
-import pdfplumber
+
+import macro_store
+import patterns
+import pdf_text
+import raw_store
+import text_index
 
 PDF_DIR = Path("data/raw/inflation/pdf")
-OUT_CSV = Path("data/processed/macro_uemoa.csv")
 
 # --- Paramètres (CI juin 2025 pour le test) ---
 COUNTRY = "Côte d’Ivoire"
@@ -18,29 +21,20 @@ def normalize(text: str) -> str:
     text = text or ""
     return re.sub(r"\s+", " ", text).strip()
 
-def extract_full_text(pdf_path: Path) -> str:
-    chunks = []
-    with pdfplumber.open(pdf_path) as pdf:
-        for page in pdf.pages:
-            t = page.extract_text()
-            if t:
-                chunks.append(t)
+def extract_fallback_text(pdf_path: Path) -> str:
+    # pages candidates + pages illisibles pour la passe brute (pas tout le PDF en pdfplumber)
+    chunks = [t for t in pdf_text.fallback_pages(pdf_path) if t]
     return normalize(" ".join(chunks))
 
 def find_ihpc_global_phrase(text: str):
     # Pattern strict: IHPC + verbe + baisse/hausse + %
-    pattern = re.compile(
-        r"((?:Indice\s+Harmonisé\s+des\s+Prix\s+à\s+la\s+Consommation\s*\(IHPC\)|IHPC)[^.]{0,400}?"
-        r"(?:enregistre|affiche|présente|observe|marque|connait|connaît)[^.]{0,250}?"
-        r"(?:une\s+)?(baisse|hausse)[^.]{0,250}?"
-        r"\(?\s*([+\-]?\s*[0-9]+(?:[.,][0-9]+)?)\s*%\s*\)?)",
-        re.IGNORECASE
-    )
+    pattern = patterns.CI_IHPC_GLOBAL
 
     # Exclusion faible: mots qui signalent sous-indice
-    exclude = re.compile(r"\b(énergie|energie|poste\s+énergie|sous[-\s]?indice|division)\b", re.IGNORECASE)
+    exclude = patterns.CI_EXCLUDE
 
-    for m in pattern.finditer(text):
+    # Pattern lourd seulement sur les phrases qui contiennent "IHPC" et "baisse"/"hausse"
+    for m in text_index.SentenceIndex(text).finditer(pattern, *text_index.IHPC_GROUPS):
         phrase = m.group(1)
         direction = m.group(2).lower()
         value_raw = m.group(3)
@@ -56,29 +50,24 @@ def find_ihpc_global_phrase(text: str):
 
     return None, None, None
 
+def find_ihpc_global_in_pdf(pdf_path: Path):
+    # Pages candidates seulement (passe brute + ancres IHPC), arrêt au premier match accepté
+    for _, page in pdf_text.iter_pages(pdf_path):
+        phrase, value, patt = find_ihpc_global_phrase(normalize(page))
+        if phrase is not None:
+            return phrase, value, patt
+    # Filet: phrase à cheval sur deux pages candidates, ou page que la passe brute n'a pas pu lire
+    return find_ihpc_global_phrase(extract_fallback_text(pdf_path))
+
 def upsert_macro(row: dict):
-    new_df = pd.DataFrame([row])
-    key_cols = ["country", "indicator", "date_reference"]
-
-    if OUT_CSV.exists():
-        old_df = pd.read_csv(OUT_CSV)
-        old_keys = old_df[key_cols].astype(str).agg("|".join, axis=1)
-        new_keys = new_df[key_cols].astype(str).agg("|".join, axis=1)
-        merged = pd.concat([old_df[~old_keys.isin(new_keys)], new_df], ignore_index=True)
-        merged.to_csv(OUT_CSV, index=False)
-    else:
-        OUT_CSV.parent.mkdir(parents=True, exist_ok=True)
-        new_df.to_csv(OUT_CSV, index=False)
+    macro_store.upsert_rows([row])
 
 # --- Main ---
-pdf_files = sorted(PDF_DIR.glob("CIV_ANSTAT_IHPC_UEMOA_2025_06_*.pdf"))
-if not pdf_files:
-    raise FileNotFoundError("PDF CI juin 2025 introuvable dans data/raw/inflation/pdf")
-
-pdf_path = pdf_files[-1]
-text = extract_full_text(pdf_path)
+pdf_path = raw_store.latest("CIV_ANSTAT_IHPC_UEMOA_2025_06", legacy_glob=f"{PDF_DIR}/CIV_ANSTAT_IHPC_UEMOA_2025_06_*.pdf")
+if pdf_path is None:
+    raise FileNotFoundError("PDF CI juin 2025 introuvable (raw_store / data/raw/inflation/pdf)")
 
-phrase, value, patt = find_ihpc_global_phrase(text)
+phrase, value, patt = find_ihpc_global_in_pdf(pdf_path)
 if phrase is None:
     raise ValueError("IHPC global non trouvé avec le pattern strict (sans OCR).")
 
@@ -2,28 +2,37 @@ from pathlib import Path
 from datetime import datetime
 import re
 import sys
-import pandas as pd
-import pdfplumber
 
-OUT_CSV = Path("data/processed/macro_uemoa.csv")
+import documents
+import extract_cache
+import macro_store
+import patterns
+import pdf_text
+import raw_store
+import supervised
+import text_index
+
 PDF_DIR = Path("data/raw/inflation/pdf")
 
+# --all: tous les bulletins stockés (historique), pas seulement le dernier par pays
+# Parallélisme / délai / plafond mémoire par PDF: voir supervised.py (UEMOA_EXTRACT_WORKERS, UEMOA_DOC_TIMEOUT, UEMOA_DOC_MEMORY_MB)
+
 # --- CONFIG: ajoute des pays ici au fur et à mesure ---
-# pdf_glob: comment repérer les PDFs du pays
+# pdf_glob: comment repérer les PDFs du pays (motif sur les clés raw_store)
 # source_name/url: pour tracer
 TARGETS = [
     {
         "country": "Côte d’Ivoire",
-        "pdf_glob": "CIV_ANSTAT_IHPC_UEMOA_*.pdf",
+        "pdf_glob": "CIV_ANSTAT_IHPC_UEMOA_*",
         "indicator": "Inflation IHPC (glissement annuel)",
         "source_name": "ANStat",
         "source_url": "https://www.anstat.ci/",
-        # date_reference: essaie d'extraire YYYY-MM depuis le nom de fichier, sinon fallback manuel
+        # date_reference: essaie d'extraire YYYY-MM depuis la clé source, sinon fallback manuel
         "date_from_filename": True,
     },
     {
         "country": "Sénégal",
-        "pdf_glob": "SEN_ANSD_IHPC_*.pdf",
+        "pdf_glob": "SEN_ANSD_IHPC_*",
         "indicator": "Inflation IHPC (annuelle)",  # on ajustera plus tard si tu ajoutes un format mensuel YoY
         "source_name": "ANSD",
         "source_url": "https://www.ansd.sn/",
@@ -32,26 +41,20 @@ TARGETS = [
 ]
 
 # Pattern strict IHPC global
-IHPC_PATTERN = re.compile(
-    r"((?:Indice\s+Harmonisé\s+des\s+Prix\s+à\s+la\s+Consommation\s*\(IHPC\)|IHPC)[^.]{0,500}?"
-    r"(?:enregistre|affiche|présente|observe|marque|connait|connaît|évolue|progresse|recule)[^.]{0,300}?"
-    r"(?:une\s+)?(baisse|hausse)[^.]{0,300}?"
-    r"\(?\s*([+\-]?\s*[0-9]+(?:[.,][0-9]+)?)\s*%\s*\)?)",
-    re.IGNORECASE
-)
+IHPC_PATTERN = patterns.IHPC_GLOBAL
+
+EXCLUDE = patterns.IHPC_EXCLUDE
 
-EXCLUDE = re.compile(r"\b(énergie|energie|poste\s+énergie|sous[-\s]?indice|division|transports?|aliments?)\b", re.IGNORECASE)
+# Cache des résultats par PDF: la version change dès qu'un pattern / mot-clé / l'extraction PDF change
+EXTRACTOR = "12.ihpc_global"
+EXTRACTOR_VERSION = extract_cache.fingerprint(IHPC_PATTERN, EXCLUDE, text_index.IHPC_GROUPS, pdf_text.EXTRACTOR_VERSION)
 
 def normalize(text: str) -> str:
     return re.sub(r"\s+", " ", (text or "")).strip()
 
 def extract_text(pdf_path: Path) -> str:
-    chunks = []
-    with pdfplumber.open(pdf_path) as pdf:
-        for page in pdf.pages:
-            t = page.extract_text()
-            if t:
-                chunks.append(t)
+    # pages candidates + pages illisibles pour la passe brute (pas tout le PDF en pdfplumber)
+    chunks = [t for t in pdf_text.fallback_pages(pdf_path) if t]
     return normalize(" ".join(chunks))
 
 def parse_date_reference_from_name(name: str):
@@ -65,26 +68,9 @@ def parse_date_reference_from_name(name: str):
         return y.group(1)
     return None
 
-def load_df():
-    if OUT_CSV.exists():
-        return pd.read_csv(OUT_CSV)
-    return pd.DataFrame()
-
-def upsert(df: pd.DataFrame, row: dict) -> pd.DataFrame:
-    new_df = pd.DataFrame([row])
-    key_cols = ["country", "indicator", "date_reference"]
-    if df.empty:
-        return new_df
-    old_keys = df[key_cols].astype(str).agg("|".join, axis=1)
-    new_keys = new_df[key_cols].astype(str).agg("|".join, axis=1)
-    return pd.concat([df[~old_keys.isin(new_keys)], new_df], ignore_index=True)
-
-def save_df(df: pd.DataFrame):
-    OUT_CSV.parent.mkdir(parents=True, exist_ok=True)
-    df.to_csv(OUT_CSV, index=False)
-
 def extract_value(text: str):
-    for m in IHPC_PATTERN.finditer(text):
+    # Pattern lourd seulement sur les phrases qui contiennent "IHPC" et "baisse"/"hausse"
+    for m in text_index.SentenceIndex(text).finditer(IHPC_PATTERN, *text_index.IHPC_GROUPS):
         phrase = m.group(1)
         if EXCLUDE.search(phrase):
             continue
@@ -96,32 +82,76 @@ def extract_value(text: str):
         return phrase, val
     return None, None
 
+def extract_value_from_pdf(pdf_path: Path):
+    # Pages candidates seulement (passe brute + ancres IHPC), arrêt au premier match accepté
+    for _, page in pdf_text.iter_pages(pdf_path):
+        phrase, val = extract_value(normalize(page))
+        if phrase is not None:
+            return phrase, val
+    # Filet: phrase à cheval sur deux pages candidates, ou page que la passe brute n'a pas pu lire
+    return extract_value(extract_text(pdf_path))
+
+def extract_value_cached(pdf_path: Path):
+    """extract_value_from_pdf + mise en cache dans le worker (seul à savoir si un pattern a été interrompu)."""
+    return extract_cache.cached(pdf_path, EXTRACTOR, EXTRACTOR_VERSION, lambda p: list(extract_value_from_pdf(p)))
+
+def pdf_entries(t: dict, history: bool) -> list[dict]:
+    """Dernier PDF du pays, ou tous ses bulletins (ordre des clés) avec history."""
+    legacy_glob = f"{PDF_DIR}/{t['pdf_glob']}.pdf"
+    if not history:
+        entry = raw_store.latest_entry(t["pdf_glob"], legacy_glob=legacy_glob)
+        return [entry] if entry else []
+    entries = raw_store.entries(t["pdf_glob"])
+    if entries:
+        return entries
+    return [{"key": p.stem, "path": p} for p in sorted(Path().glob(legacy_glob))]
+
 def main():
-    df = load_df()
+    history = "--all" in sys.argv[1:]
     now = datetime.now().isoformat(timespec="seconds")
 
-    any_written = False
-
+    # 1) Jobs (pays, PDF)
+    jobs = []
     for t in TARGETS:
-        pdfs = sorted(PDF_DIR.glob(t["pdf_glob"]))
-        if not pdfs:
+        entries = pdf_entries(t, history)
+        if not entries:
             print(f"NEEDS AUDIT -> {t['country']} | Aucun PDF trouvé ({t['pdf_glob']})")
             continue
 
-        pdf_path = pdfs[-1]
-        date_ref = parse_date_reference_from_name(pdf_path.name) if t.get("date_from_filename") else None
-        if not date_ref:
-            print(f"NEEDS AUDIT -> {t['country']} | date_reference introuvable dans le nom: {pdf_path.name}")
+        for entry in entries:
+            date_ref = parse_date_reference_from_name(entry["key"]) if t.get("date_from_filename") else None
+            if not date_ref:
+                print(f"NEEDS AUDIT -> {t['country']} | date_reference introuvable dans le nom: {entry['key']}")
+                continue
+            jobs.append((t, entry["path"], date_ref))
+
+    # 2) Résultats en cache (PDF et patterns inchangés), sinon extraction supervisée:
+    #    un processus par PDF, délai et plafond mémoire
+    results, todo = {}, {}
+    for i, (_, pdf_path, _) in enumerate(jobs):
+        hit, cached = extract_cache.get(documents.document_sha256(pdf_path), EXTRACTOR, EXTRACTOR_VERSION)
+        if hit:
+            results[i] = tuple(cached)
+        else:
+            todo[i] = pdf_path
+
+    print(f"Extraction: {len(todo)} PDF(s) ({len(results)} en cache) | workers: {supervised.WORKERS} | délai: {supervised.DOC_TIMEOUT:g} s")
+    if todo:
+        done = supervised.run_supervised(extract_value_cached, todo)
+        results.update({i: res if isinstance(res, Exception) else tuple(res) for i, res in done.items()})
+
+    # 3) Lignes puis un seul upsert / une seule écriture
+    rows = []
+    for i, (t, pdf_path, date_ref) in enumerate(jobs):
+        if isinstance(results[i], Exception):
+            print(f"NEEDS AUDIT -> {t['country']} {date_ref} | extraction interrompue ({results[i]!r}). PDF: {pdf_path.name}")
             continue
-
-        text = extract_text(pdf_path)
-        phrase, value = extract_value(text)
-
+        phrase, value = results[i]
         if phrase is None:
             print(f"NEEDS AUDIT -> {t['country']} {date_ref} | IHPC global non trouvé (pattern strict). PDF: {pdf_path.name}")
             continue
 
-        row = {
+        rows.append({
             "country": t["country"],
             "indicator": t["indicator"],
             "value": value,
@@ -131,14 +161,15 @@ def main():
             "source_url": t["source_url"],
             "collected_at": now,
             "comment": f"Extraction IHPC global (pattern strict). Phrase: {phrase}",
-        }
-
-        df = upsert(df, row)
-        any_written = True
+        })
         print(f"UPSERT OK -> {t['country']} {date_ref} = {value} % | PDF: {pdf_path.name}")
 
-    if any_written:
-        save_df(df)
+    store = macro_store.open_store()
+    if rows and store.unchanged(rows):
+        print("Aucun changement: lignes déjà présentes dans macro_uemoa.csv.")
+    elif rows:
+        store.upsert(rows)
+        store.save()
         print("OK -> macro_uemoa.csv mis à jour.")
     else:
         print("Aucune écriture effectuée (tout en audit).")
@@ -1,14 +1,8 @@
-import requests
-from bs4 import BeautifulSoup
+from urllib.parse import urljoin
 import re
-import urllib3
 
-# Désactiver les warnings SSL (sites institutionnels mal configurés)
-urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
-
-HEADERS = {
-    "User-Agent": "Mozilla/5.0 (compatible; UEMOA-Macro-Watch/1.0)"
-}
+import documents
+from fetcher import fetch_many
 
 TARGETS = [
     {
@@ -25,19 +19,11 @@ TARGETS = [
     },
 ]
 
-def list_pdfs(base_url: str, pdf_regex: re.Pattern):
+def list_pdfs(html: str, base_url: str, pdf_regex: re.Pattern):
     """
     Récupère tous les liens PDF correspondant au regex sur une page donnée
     """
-    response = requests.get(
-        base_url,
-        headers=HEADERS,
-        timeout=30,
-        verify=False  # IMPORTANT : sites ANSD / ANStat
-    )
-    response.raise_for_status()
-
-    soup = BeautifulSoup(response.text, "html.parser")
+    soup = documents.parse_html(html)
 
     pdfs = []
     for a in soup.find_all("a", href=True):
@@ -49,7 +35,7 @@ def list_pdfs(base_url: str, pdf_regex: re.Pattern):
 
         if pdf_regex.search(href) or pdf_regex.search(text):
             if not href.startswith("http"):
-                href = requests.compat.urljoin(base_url, href)
+                href = urljoin(base_url, href)
             pdfs.append({
                 "title": text,
                 "url": href
@@ -59,11 +45,16 @@ def list_pdfs(base_url: str, pdf_regex: re.Pattern):
 
 print("\n=== LISTE DES PDFs IHPC DISPONIBLES (SCRIPT 13) ===\n")
 
-for target in TARGETS:
+# SSL: verify=False pour ANSD / ANStat (règle par domaine dans fetcher)
+pages = fetch_many({i: t["url"] for i, t in enumerate(TARGETS)}, timeout=30)
+
+for i, target in enumerate(TARGETS):
     print(f"--- {target['country']} | {target['name']} ---")
 
     try:
-        pdfs = list_pdfs(target["url"], target["pdf_regex"])
+        if isinstance(pages[i], Exception):
+            raise pages[i]
+        pdfs = list_pdfs(pages[i].text, target["url"], target["pdf_regex"])
 
         if not pdfs:
             print("⚠️  Aucun PDF IHPC détecté sur cette page.")
@@ -1,13 +1,9 @@
-from pathlib import Path
-from datetime import datetime
+from urllib.parse import urljoin
 import re
-import requests
-from bs4 import BeautifulSoup
-import urllib3
 
-urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
-
-HEADERS = {"User-Agent": "Mozilla/5.0 (compatible; uemoa-macro-watch/1.0)"}
+import documents
+import raw_store
+from fetcher import fetch_many
 
 URLS = [
     "https://www.anstat.ci/indicateur-details/1d9192e901c724a6217631034cc3cc45b74984f99fae02aa663715346db147d653d0854a7cd2e2fc1fe88b179a41f0b350a20a394b427fc24704d4e94cd0478e7elCY_4H4C8Hx69ardSve9-Jh_ZMncuulMUEm1kIUJc",
@@ -16,21 +12,12 @@ URLS = [
     "https://www.anstat.ci/indicateur-details/feb6932fe3d2331df4e834753637829d5632a1a406d8e60424b56de233e529c11a1a27719071cef73560a06e932c56d48e42be2e3d05eba549ddddf7106b32daakLsFCuBGDXOUjVdFKEbTxHSbPUv74Txm9qBy2XTlbE",
 ]
 
-OUT_DIR = Path("data/raw/anstat")
-OUT_DIR.mkdir(parents=True, exist_ok=True)
-
 API_HINTS = re.compile(r"(api|graphql|endpoint|json|indicateur|indicator|series|chart|data)", re.IGNORECASE)
 
-def fetch(url: str) -> str:
-    r = requests.get(url, headers=HEADERS, timeout=45, verify=False)
-    r.raise_for_status()
-    return r.text
-
 def normalize_ws(s: str) -> str:
     return re.sub(r"\s+", " ", (s or "")).strip()
 
-def extract_candidates(html: str, base_url: str):
-    soup = BeautifulSoup(html, "html.parser")
+def extract_candidates(html: str, soup, base_url: str):
 
     title = None
     for sel in ["h1", "h2", "h3", "title"]:
@@ -45,7 +32,7 @@ def extract_candidates(html: str, base_url: str):
     for a in soup.select("a[href]"):
         href = a.get("href", "").strip()
         if href.lower().endswith(".pdf"):
-            pdfs.add(requests.compat.urljoin(base_url, href))
+            pdfs.add(urljoin(base_url, href))
 
     # Any absolute PDFs in raw html
     for m in re.finditer(r"(https?://[^\s\"']+\.pdf)", html, re.IGNORECASE):
@@ -64,7 +51,7 @@ def extract_candidates(html: str, base_url: str):
         src = s.get("src", "").strip()
         if not src:
             continue
-        full = requests.compat.urljoin(base_url, src)
+        full = urljoin(base_url, src)
         scripts.add(full)
 
     # Look for embedded JSON blobs
@@ -77,26 +64,28 @@ def extract_candidates(html: str, base_url: str):
     return title, sorted(pdfs), sorted(endpoints), sorted(scripts), json_snippets
 
 def main():
-    ts = datetime.now().strftime("%Y%m%d_%H%M%S")
     base = "https://www.anstat.ci/"
 
     print("\n=== PROBE ANStat: indicateur-details (diagnostic) ===\n")
 
+    # Toutes les pages en parallèle (verify=False pour anstat.ci, géré par fetcher)
+    pages = fetch_many(dict(enumerate(URLS, start=1)), timeout=45)
+
     for i, url in enumerate(URLS, start=1):
         print(f"\n[{i}] URL: {url}")
 
-        try:
-            html = fetch(url)
-        except Exception as e:
-            print("  ERROR fetch:", e)
+        if isinstance(pages[i], Exception):
+            print("  ERROR fetch:", pages[i])
             continue
+        html = pages[i].text
 
-        # Save HTML for inspection
-        out_html = OUT_DIR / f"anstat_indicator_{i}_{ts}.html"
-        out_html.write_text(html, encoding="utf-8")
+        # Save HTML for inspection (raw_store: une page identique n'est stockée qu'une fois)
+        out_html, _ = raw_store.put(f"anstat_indicator_{i}", html.encode("utf-8"), url=url, suffix=".html")
         print(f"  Saved HTML -> {out_html}")
 
-        title, pdfs, endpoints, scripts, json_snips = extract_candidates(html, base)
+        # Un seul arbre par page, réutilisé pour les candidats et l'aperçu texte
+        soup = documents.parse_html(html)
+        title, pdfs, endpoints, scripts, json_snips = extract_candidates(html, soup, base)
         print(f"  Title: {title}")
 
         print(f"  PDF links found: {len(pdfs)}")
@@ -116,7 +105,7 @@ def main():
             print("   -", normalize_ws(json_snips[0])[:300])
 
         # Also show a small text preview (to see if data is server-rendered)
-        text_preview = normalize_ws(BeautifulSoup(html, "html.parser").get_text(" ", strip=True))[:400]
+        text_preview = normalize_ws(soup.get_text(" ", strip=True))[:400]
         print("  Text preview:", text_preview)
 
     print("\n=== FIN PROBE ===\n")
@@ -1,19 +1,9 @@
-from pathlib import Path
-import pandas as pd
+import macro_store
 
-CSV_PATH = Path("data/processed/macro_uemoa.csv")
+store = macro_store.open_store()
 
-df = pd.read_csv(CSV_PATH)
+removed = store.delete_where(country="Côte d’Ivoire", indicator="Inflation IHPC (glissement annuel)", date_reference="2025-06")
+store.save()
 
-before = len(df)
-df = df[~(
-    (df["country"].astype(str) == "Côte d’Ivoire")
-    & (df["indicator"].astype(str) == "Inflation IHPC (glissement annuel)")
-    & (df["date_reference"].astype(str) == "2025-06")
-)].copy()
-
-after = len(df)
-df.to_csv(CSV_PATH, index=False)
-
-print(f"OK -> Deleted {before-after} row(s).")
-print(df[df["country"].astype(str) == "Côte d’Ivoire"].sort_values(["indicator","date_reference"]).to_string(index=False))
+print(f"OK -> Deleted {removed} row(s).")
+print(store.select(country="Côte d’Ivoire").sort_values(["indicator","date_reference"]).to_string(index=False))
@@ -0,0 +1,175 @@
+"""
+Registre persistant des indicateurs ANStat: label -> page indicateur -> ID numérique -> titre -> hash du dernier CSV.
+
+Les pages `indicateur-details` sont lourdes et l'ID se trouve par regex dans le HTML.
+On ne le résout qu'une fois: les runs suivants vont directement à download_csv/<id>.
+L'ID n'est re-résolu que si le téléchargement du CSV échoue (ID périmé) ou si
+resolve() est appelé explicitement (refresh=True).
+
+Fichier: data/cache/anstat_registry.json
+"""
+import hashlib
+import json
+import re
+import threading
+from datetime import datetime
+from pathlib import Path
+
+import requests
+
+import documents
+from fetcher import fetch, fetch_conditional
+
+REGISTRY = Path("data/cache/anstat_registry.json")
+
+DOWNLOAD_PREFIX = "https://www.anstat.ci/indicateur/download_csv/"
+
+INDICATOR_URLS = {
+    "IHPC_national": "https://www.anstat.ci/indicateur-details/1d9192e901c724a6217631034cc3cc45b74984f99fae02aa663715346db147d653d0854a7cd2e2fc1fe88b179a41f0b350a20a394b427fc24704d4e94cd0478e7elCY_4H4C8Hx69ardSve9-Jh_ZMncuulMUEm1kIUJc",
+    "Infl_gliss_moy_ann": "https://www.anstat.ci/indicateur-details/4abbd412ba595b43eff78fc2aec8338fbae7a24b9826d2eabb1f255815c99670023507833469a4a09e5e30b8dd26350970e37c55b84ccb9fb62d9dc1b2dd98c43Xbezh96bRbC-ZRFbFQCJc5Uf8dDLuqYRhpwUFXDhvM",
+    "Infl_moy_ann": "https://www.anstat.ci/indicateur-details/72c050f25f408ab781f73b7fc9375cf05f977ba89dffaf6e023ac1214bef56652503451b0719b1753a05a86669697213527f0f6524e5037df237d034c198bd7632wz--xp8G9SbscLHJJfzVscQUtFMpCD5Tqjl0NdCek",
+    "Infl_moy_mens": "https://www.anstat.ci/indicateur-details/feb6932fe3d2331df4e834753637829d5632a1a406d8e60424b56de233e529c11a1a27719071cef73560a06e932c56d48e42be2e3d05eba549ddddf7106b32daakLsFCuBGDXOUjVdFKEbTxHSbPUv74Txm9qBy2XTlbE",
+}
+
+# IDs déjà vérifiés à la main (ex-constantes de 18): évitent la page détail au premier run
+SEED_IDS = {
+    "IHPC_national": "1868",
+    "Infl_moy_ann": "1917",
+    "Infl_gliss_moy_ann": "1871",
+    "Infl_moy_mens": "624",
+}
+
+_registry: dict | None = None
+_lock = threading.Lock()
+
+
+def _load() -> dict:
+    global _registry
+    if _registry is None:
+        _registry = json.loads(REGISTRY.read_text(encoding="utf-8")) if REGISTRY.exists() else {}
+    return _registry
+
+
+def _save():
+    REGISTRY.parent.mkdir(parents=True, exist_ok=True)
+    tmp = REGISTRY.with_suffix(".tmp")
+    tmp.write_text(json.dumps(_registry, ensure_ascii=False, indent=1), encoding="utf-8")
+    tmp.replace(REGISTRY)
+
+
+def _update(label: str, **fields):
+    with _lock:
+        entry = _load().setdefault(label, {"url": INDICATOR_URLS.get(label)})
+        entry.update(fields)
+        _save()
+
+
+def entry(label: str) -> dict:
+    with _lock:
+        return dict(_load().get(label, {}))
+
+
+def find_indicator_id(html: str) -> str | None:
+    """
+    Cherche un ID d'indicateur dans le HTML.
+    Stratégies (dans cet ordre) :
+    1) data-id="123"
+    2) data-id='123'
+    3) id: 123 dans un blob JS/JSON
+    4) /download_csv/123 si l'URL est déjà écrite
+    """
+    # 1/2) data-id
+    m = re.search(r'data-id\s*=\s*["\'](\d{1,10})["\']', html, re.IGNORECASE)
+    if m:
+        return m.group(1)
+
+    # 3) JSON/JS style: "id":123 or id:123
+    m = re.search(r'["\']id["\']\s*:\s*(\d{1,10})', html, re.IGNORECASE)
+    if m:
+        return m.group(1)
+
+    m = re.search(r'\bid\s*:\s*(\d{1,10})\b', html, re.IGNORECASE)
+    if m:
+        return m.group(1)
+
+    # 4) download_csv already present
+    m = re.search(r'/indicateur/download_csv/(\d{1,10})', html, re.IGNORECASE)
+    if m:
+        return m.group(1)
+
+    return None
+
+
+def resolve(label: str, refresh: bool = False) -> str | None:
+    """
+    ID de l'indicateur. Sans refresh: registre, puis SEED_IDS, puis page détail.
+    Avec refresh: relit la page détail (GET conditionnel) ; si elle n'a pas changé
+    et que l'ID est connu, rien n'est re-parsé.
+    """
+    known = entry(label)
+    if not refresh:
+        if known.get("indicator_id"):
+            return known["indicator_id"]
+        if label in SEED_IDS:
+            _update(label, indicator_id=SEED_IDS[label], resolved_at=datetime.now().isoformat(timespec="seconds"), resolved_by="seed")
+            return SEED_IDS[label]
+
+    url = INDICATOR_URLS[label]
+    page_path, changed = fetch_conditional(url, key=f"anstat_indicator_page_{label}", suffix=".html", as_text=True, timeout=45)
+    if not changed and known.get("page_sha256") and known.get("resolved_by") == "page":
+        return known.get("indicator_id")
+
+    html = page_path.read_text(encoding="utf-8", errors="replace")
+    soup = documents.parse_html(html)
+    title = (soup.select_one("h1") or soup.select_one("h2") or soup.select_one("title"))
+    title = title.get_text(" ", strip=True) if title else ""
+
+    ind_id = find_indicator_id(html)
+    _update(
+        label,
+        indicator_id=ind_id,
+        title=title,
+        page_sha256=page_path.stem,
+        resolved_at=datetime.now().isoformat(timespec="seconds"),
+        resolved_by="page",
+    )
+    return ind_id
+
+
+def _looks_like_csv(body: bytes) -> bool:
+    head = body[:200].lstrip().lower()
+    return bool(head) and not head.startswith((b"<!doctype", b"<html", b"<"))
+
+
+def download_csv(label: str) -> tuple[str, bytes, bool]:
+    """
+    Télécharge le CSV de l'indicateur via l'ID du registre.
+    Si l'ID est périmé (erreur HTTP ou page HTML au lieu d'un CSV), re-résout l'ID une fois.
+    LookupError (NEEDS AUDIT) si le téléchargement échoue encore après re-résolution.
+    Retourne (indicator_id, contenu, changed) ; changed=False si même hash que le dernier CSV.
+    """
+    ind_id = resolve(label)
+    body = None
+    if ind_id:
+        try:
+            body = fetch(DOWNLOAD_PREFIX + ind_id, timeout=60).content
+        except requests.HTTPError:
+            body = None
+        if body is not None and not _looks_like_csv(body):
+            body = None
+
+    if body is None:
+        ind_id = resolve(label, refresh=True)
+        if not ind_id:
+            raise LookupError(f"{label}: ID indicateur introuvable dans la page détail (NEEDS AUDIT)")
+        try:
+            body = fetch(DOWNLOAD_PREFIX + ind_id, timeout=60).content
+        except requests.HTTPError as e:
+            raise LookupError(f"{label}: téléchargement CSV en échec après re-résolution de l'ID {ind_id} ({e}) (NEEDS AUDIT)") from e
+        if not _looks_like_csv(body):
+            raise LookupError(f"{label}: l'ID {ind_id} re-résolu ne renvoie pas un CSV (page HTML ?) (NEEDS AUDIT)")
+
+    sha = hashlib.sha256(body).hexdigest()
+    changed = entry(label).get("csv_sha256") != sha
+    _update(label, csv_sha256=sha, csv_checked_at=datetime.now().isoformat(timespec="seconds"))
+    return ind_id, body, changed
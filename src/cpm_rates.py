@@ -0,0 +1,223 @@
+"""
+Moteur d'extraction des taux des communiqués CPM (Comité de Politique Monétaire BCEAO).
+
+Tous les taux sont déclarés ensemble dans RATE_SPECS. Le texte est parcouru une seule fois
+avec une regex d'ancres (mots-clés comme "taux directeur", "guichet de prêt marginal"):
+les patterns coûteux d'un taux ne tournent que dans une fenêtre autour de ses ancres.
+Un taux sans ancre dans le texte ne coûte rien.
+
+Pour ajouter un taux: une entrée de plus dans RATE_SPECS (indicateur, ancre, patterns).
+
+extract_document(path) est le point d'entrée des workers du backfill historique (05b --backfill):
+texte + date de réunion + taux pour un communiqué stocké. extract_document_cached(path) en est
+la version mémoïsée par contenu (extract_cache), utilisée par 04, 05 et 05b.
+
+Vérification: python src/cpm_rates.py (date de réunion sur des formulations réelles des communiqués).
+"""
+import re
+from pathlib import Path
+
+import documents
+import extract_cache
+import patterns
+
+# Fenêtre autour d'une ancre où l'on applique les patterns du taux.
+# Couvre les formes "ancre ... X%" et "maintenir à X% ... ancre".
+WINDOW_BEFORE = 300
+WINDOW_AFTER = 300
+
+NUMBER = r"([0-9]+(?:[.,][0-9]+)?)"
+
+RATE_SPECS = [
+    {
+        "name": "policy_rate",
+        "indicator": "Taux directeur BCEAO (principal)",
+        "unit": "%",
+        "anchor": r"taux\s+directeur|taux\s+minimum\s+de\s+soumission",
+        "patterns": [
+            re.compile(r"principal\s+taux\s+directeur[^0-9]{0,80}" + NUMBER + r"\s*%", re.IGNORECASE),
+            re.compile(r"maintenir\s+à\s*" + NUMBER + r"\s*%[^.]{0,120}principal\s+taux\s+directeur", re.IGNORECASE),
+            re.compile(r"taux\s+minimum\s+de\s+soumission[^0-9]{0,80}" + NUMBER + r"\s*%", re.IGNORECASE),
+        ],
+    },
+    {
+        "name": "marginal_lending_rate",
+        "indicator": "Taux BCEAO (guichet de prêt marginal)",
+        "unit": "%",
+        "anchor": r"guichet\s+de\s+pr[eê]t\s+marginal",
+        "patterns": [
+            re.compile(r"guichet\s+de\s+pr[eê]t\s+marginal[^0-9]{0,80}" + NUMBER + r"\s*%", re.IGNORECASE),
+            # Variante fréquente : "taux du guichet de prêt marginal ... à 5,25%"
+            re.compile(r"taux\s+du\s+guichet\s+de\s+pr[eê]t\s+marginal[^0-9]{0,120}" + NUMBER + r"\s*%", re.IGNORECASE),
+            # Variante inversée : "maintenir à 5,25% le taux du guichet de prêt marginal"
+            re.compile(r"maintenir\s+à\s*" + NUMBER + r"\s*%[^.]{0,140}guichet\s+de\s+pr[eê]t\s+marginal", re.IGNORECASE),
+        ],
+    },
+    {
+        "name": "reserve_ratio",
+        "indicator": "Coefficient de réserves obligatoires BCEAO",
+        "unit": "%",
+        "anchor": r"r[ée]serves?\s+obligatoires",
+        "patterns": [
+            re.compile(r"coefficient\s+de\s+r[ée]serves?\s+obligatoires[^0-9]{0,120}" + NUMBER + r"\s*%", re.IGNORECASE),
+            re.compile(r"maintenir\s+à\s*" + NUMBER + r"\s*%[^.]{0,140}coefficient\s+de\s+r[ée]serves?\s+obligatoires", re.IGNORECASE),
+        ],
+    },
+]
+
+# Patterns enregistrés dans le registre (budget de temps, benchmark): cpm.<taux>.<n>
+for spec in RATE_SPECS:
+    spec["patterns"] = [patterns.register(f"cpm.{spec['name']}.{i}", p.pattern, p.flags) for i, p in enumerate(spec["patterns"])]
+
+SPECS_BY_NAME = {spec["name"]: spec for spec in RATE_SPECS}
+
+# Une seule regex d'ancres, un groupe nommé par taux
+ANCHORS = patterns.register("cpm.anchors", "|".join(f"(?P<{spec['name']}>{spec['anchor']})" for spec in RATE_SPECS))
+
+
+def to_float(x: str) -> float:
+    return float(x.replace(",", ".").strip())
+
+
+def anchor_positions(text: str) -> dict[str, list[int]]:
+    """Un seul passage sur le texte: positions des ancres, par taux."""
+    positions = {spec["name"]: [] for spec in RATE_SPECS}
+    for m in ANCHORS.finditer(text):
+        positions[m.lastgroup].append(m.start())
+    return positions
+
+
+def _windows(starts: list[int], length: int) -> list[tuple[int, int]]:
+    """Fenêtres autour des ancres, fusionnées quand elles se chevauchent."""
+    spans = []
+    for pos in starts:
+        lo, hi = max(0, pos - WINDOW_BEFORE), min(length, pos + WINDOW_AFTER)
+        if spans and lo <= spans[-1][1]:
+            spans[-1] = (spans[-1][0], max(spans[-1][1], hi))
+        else:
+            spans.append((lo, hi))
+    return spans
+
+
+def _search_near(pattern: patterns.GuardedPattern, text: str, spans: list[tuple[int, int]]):
+    """Premier match de pattern dans les fenêtres (ordre du texte)."""
+    for lo, hi in spans:
+        m = pattern.search(text, lo, hi)
+        if m:
+            return m
+    return None
+
+
+def extract_rates(text: str, names: list[str] | None = None) -> dict[str, dict | None]:
+    """
+    Extrait tous les taux de RATE_SPECS (ou seulement `names`) en un passage.
+    Pour chaque taux, les patterns sont essayés dans l'ordre déclaré (le premier qui matche gagne).
+
+    Retourne {name: {"indicator", "value", "unit", "pattern", "match"} | None}.
+    """
+    positions = anchor_positions(text)
+    results = {}
+
+    for spec in RATE_SPECS:
+        if names is not None and spec["name"] not in names:
+            continue
+        results[spec["name"]] = None
+        starts = positions[spec["name"]]
+        if not starts:
+            continue
+        spans = _windows(starts, len(text))
+        for p in spec["patterns"]:
+            m = _search_near(p, text, spans)
+            if m:
+                results[spec["name"]] = {
+                    "indicator": spec["indicator"],
+                    "value": to_float(m.group(1)),
+                    "unit": spec["unit"],
+                    "pattern": p.pattern,
+                    "match": m.group(0),
+                }
+                break
+
+    return results
+
+
+MONTHS = {
+    "janvier": 1, "février": 2, "fevrier": 2, "mars": 3, "avril": 4, "mai": 5, "juin": 6,
+    "juillet": 7, "août": 8, "aout": 8, "septembre": 9, "octobre": 10, "novembre": 11,
+    "décembre": 12, "decembre": 12,
+}
+
+_DATE = r"(\d{1,2})(?:er)?\s+(" + "|".join(MONTHS) + r")\s+(20\d{2}|19\d{2})"
+
+# "réunion ordinaire ... tenue le 3 décembre 2025", "s'est réuni le mercredi 3 décembre 2025",
+# "a tenu, le mercredi 3 décembre 2025, sa quatrième réunion ordinaire" (virgule après le verbe)
+MEETING_DATE = patterns.register(
+    "cpm.meeting_date",
+    r"\b(?:tenue?|r[ée]uni(?:e|s)?|r[ée]union\s+(?:extra)?ordinaire)(?:\s*,\s*|\s+)(?:le\s+)?"
+    r"(?:(?:lundi|mardi|mercredi|jeudi|vendredi|samedi|dimanche)\s+)?" + _DATE,
+)
+
+# Formulations réelles des communiqués -> date attendue (python src/cpm_rates.py les vérifie)
+MEETING_DATE_EXAMPLES = [
+    ("Le Comité de Politique Monétaire (CPM) de la Banque Centrale des États de l'Afrique de l'Ouest (BCEAO) "
+     "a tenu, le mercredi 3 décembre 2025, sa quatrième réunion ordinaire de l'année 2025.", "2025-12-03"),
+    ("Le Comité de Politique Monétaire de la BCEAO s'est réuni le mercredi 3 décembre 2025 à Dakar.", "2025-12-03"),
+    ("Réunion ordinaire du Comité de Politique Monétaire de la BCEAO tenue le 1er mars 2023.", "2023-03-01"),
+    ("Le taux directeur est inchangé depuis le 16 septembre 2024.", None),
+]
+
+
+# Version de l'extracteur: change dès qu'un pattern, une fenêtre ou la normalisation du texte change
+EXTRACTOR = "cpm_rates"
+EXTRACTOR_VERSION = extract_cache.fingerprint(
+    *(p for spec in RATE_SPECS for p in spec["patterns"]), ANCHORS, MEETING_DATE,
+    WINDOW_BEFORE, WINDOW_AFTER, documents.HTML_PARSER, documents.TEXT_VERSION,
+)
+
+
+def meeting_date(text: str) -> str | None:
+    """Date de la réunion du CPM (YYYY-MM-DD) d'après la phrase "tenue le / réuni le".
+    None sans cette phrase (la première date du texte peut être celle d'une autre réunion): NEEDS AUDIT."""
+    m = MEETING_DATE.search(text)
+    if not m:
+        return None
+    day, month, year = int(m.group(1)), MONTHS[m.group(2).lower()], int(m.group(3))
+    return f"{year:04d}-{month:02d}-{day:02d}"
+
+
+def check_meeting_dates() -> list[str]:
+    """Écarts entre meeting_date et MEETING_DATE_EXAMPLES (liste vide = tout est bon)."""
+    return [
+        f"{text[:60]!r}...: {meeting_date(text)!r} au lieu de {expected!r}"
+        for text, expected in MEETING_DATE_EXAMPLES
+        if meeting_date(text) != expected
+    ]
+
+
+def extract_document(path: Path) -> dict:
+    """Un communiqué: {"date_reference", "rates"}. Fonction de module => utilisable dans un pool de processus."""
+    text = documents.html_text(path)
+    return {"date_reference": meeting_date(text), "rates": extract_rates(text)}
+
+
+def extract_document_cached(path: Path) -> dict:
+    """extract_document sans re-parsing ni regex si le communiqué et les patterns n'ont pas changé."""
+    return extract_cache.cached(path, EXTRACTOR, EXTRACTOR_VERSION, extract_document)
+
+
+def context_snippet(text: str, keyword: str, before: int = 250, after: int = 500) -> str:
+    """Extrait utile autour d'un mot-clé (messages d'erreur quand un taux n'est pas trouvé)."""
+    idx = text.lower().find(keyword)
+    return text[max(0, idx - before): idx + after] if idx != -1 else text[:before + after]
+
+
+def main():
+    errors = check_meeting_dates()
+    for e in errors:
+        print("FAIL -> date de réunion", e)
+    print(f"{len(MEETING_DATE_EXAMPLES) - len(errors)}/{len(MEETING_DATE_EXAMPLES)} formulation(s) de date de réunion reconnue(s)")
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
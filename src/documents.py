@@ -0,0 +1,68 @@
+"""
+Chargement des documents HTML: un seul parsing par document, texte partagé entre extracteurs.
+
+- parseur rapide: lxml si installé, sinon html.parser (même API BeautifulSoup, même get_text)
+- html_text(path): texte normalisé `get_text(" ", strip=True)` mémoïsé par SHA-256 du fichier,
+  en mémoire et sur disque (data/cache/text/), donc 04 et 05 sur le même communiqué
+  ne parsent le HTML qu'une fois au total
+"""
+import os
+import re
+import threading
+from pathlib import Path
+
+from bs4 import BeautifulSoup
+
+import raw_store
+
+try:
+    import lxml  # noqa: F401
+    HTML_PARSER = "lxml"
+except ImportError:
+    HTML_PARSER = "html.parser"
+
+TEXT_CACHE_DIR = Path("data/cache/text")
+TEXT_VERSION = "v1"  # à incrémenter si la normalisation du texte change
+
+_SHA_RE = re.compile(r"^[0-9a-f]{64}$")
+
+_texts: dict[str, str] = {}
+_lock = threading.Lock()
+
+
+def parse_html(html: str) -> BeautifulSoup:
+    return BeautifulSoup(html, HTML_PARSER)
+
+
+def document_sha256(path: Path) -> str:
+    """Les blobs de raw_store sont déjà nommés par leur hash: pas besoin de relire le fichier."""
+    path = Path(path)
+    if _SHA_RE.match(path.stem):
+        return path.stem
+    return raw_store.file_sha256(path)
+
+
+def load_html(path: Path) -> str:
+    return Path(path).read_text(encoding="utf-8", errors="replace")
+
+
+def html_text(path: Path) -> str:
+    """Texte de la page (get_text(" ", strip=True)), parsé au plus une fois par contenu."""
+    sha = document_sha256(path)
+    with _lock:
+        if sha in _texts:
+            return _texts[sha]
+
+    cache_path = TEXT_CACHE_DIR / f"{sha}.{HTML_PARSER}.{TEXT_VERSION}.txt"
+    if cache_path.exists():
+        text = cache_path.read_text(encoding="utf-8")
+    else:
+        text = parse_html(load_html(path)).get_text(" ", strip=True)
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = cache_path.with_name(f"{cache_path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp.write_text(text, encoding="utf-8")
+        tmp.replace(cache_path)
+
+    with _lock:
+        _texts[sha] = text
+    return text
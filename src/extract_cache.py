@@ -0,0 +1,66 @@
+"""
+Cache des résultats d'extraction: un document inchangé n'est jamais ré-extrait.
+
+Clé = (SHA-256 du document, nom de l'extracteur, version de l'extracteur)
+- la version est une empreinte des patterns utilisés + un numéro manuel (fingerprint):
+  modifier un pattern change la version, l'ancien résultat est ignoré automatiquement
+- fichier: data/cache/extract/<extracteur>/<sha>.<version>.json
+- les résultats négatifs (rien trouvé) sont aussi mis en cache; les erreurs
+  (timeout, crash) ne le sont pas, y compris un pattern interrompu par son budget
+  (patterns.timeouts()): son "rien trouvé" serait sinon figé pour ce document
+
+Un run sans changement n'écrit rien dans le CSV: voir macro_store.MacroStore.unchanged().
+"""
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+
+import documents
+import patterns
+
+EXTRACT_CACHE_DIR = Path("data/cache/extract")
+
+
+def fingerprint(*parts, version: str = "v1") -> str:
+    """Empreinte courte des patterns (objets avec .pattern, ou chaînes / tuples) + version manuelle."""
+    h = hashlib.sha256(version.encode("utf-8"))
+    for p in parts:
+        h.update(b"\0" + str(getattr(p, "pattern", p)).encode("utf-8"))
+    return h.hexdigest()[:16]
+
+
+def cache_path(doc_sha: str, extractor: str, version: str) -> Path:
+    return EXTRACT_CACHE_DIR / extractor / f"{doc_sha}.{version}.json"
+
+
+def get(doc_sha: str, extractor: str, version: str):
+    """(True, résultat) si en cache, sinon (False, None)."""
+    path = cache_path(doc_sha, extractor, version)
+    if not path.exists():
+        return False, None
+    return True, json.loads(path.read_text(encoding="utf-8"))
+
+
+def put(doc_sha: str, extractor: str, version: str, result):
+    path = cache_path(doc_sha, extractor, version)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    tmp.write_text(json.dumps(result, ensure_ascii=False), encoding="utf-8")
+    tmp.replace(path)
+
+
+def cached(doc_path: Path, extractor: str, version: str, func):
+    """func(doc_path) mémoïsé par contenu du document; le résultat doit être sérialisable en JSON.
+    Pas de mise en cache si un pattern a été interrompu pendant func (résultat incomplet)."""
+    sha = documents.document_sha256(doc_path)
+    hit, result = get(sha, extractor, version)
+    if hit:
+        return result
+    interrupted = patterns.timeouts()
+    result = func(doc_path)
+    if patterns.timeouts() == interrupted:
+        put(sha, extractor, version, result)
+    return result
+
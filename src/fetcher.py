@@ -0,0 +1,304 @@
+"""
+Moteur de téléchargement partagé par tous les scripts de collecte.
+
+- une Session requests par hôte (keep-alive + pool de connexions)
+- téléchargements en parallèle dans un pool de threads (FETCH_WORKERS)
+- exceptions SSL contrôlées par domaine (sites ANSD / ANStat mal configurés)
+- requêtes conditionnelles (ETag / Last-Modified) avec cache persistant:
+  un 304 réutilise la copie locale (raw_store) au lieu d'écrire un nouveau fichier
+- téléchargement en flux (stream=True) pour les gros PDF: mémoire constante,
+  reprise par Range après coupure, contrôle de taille + SHA-256 à la fin
+- chaque requête passe par host_scheduler: débit par hôte, retries avec backoff,
+  disjoncteur quand un hôte est hors service
+- UEMOA_HTTP_MODE=record|replay: enregistrement / rejeu hors ligne (http_replay)
+
+Usage:
+    from fetcher import fetch, fetch_many, fetch_many_conditional
+
+    r = fetch("https://www.bceao.int/fr/communique-presse")
+    results = fetch_many({"ansd": "https://www.ansd.sn/", "anstat": "https://www.anstat.ci/"})
+    saved = fetch_many_conditional({"ansd_home": "https://www.ansd.sn/"}, suffix=".html")
+"""
+import hashlib
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from urllib.parse import urlparse
+
+import certifi
+import requests
+import urllib3
+from requests.adapters import HTTPAdapter
+
+import host_scheduler
+import http_replay
+import raw_store
+
+urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+
+HEADERS = {"User-Agent": "Mozilla/5.0 (compatible; uemoa-macro-watch/1.0)"}
+
+# Nombre max de requêtes simultanées (toutes origines confondues)
+FETCH_WORKERS = int(os.environ.get("UEMOA_FETCH_WORKERS", "8"))
+
+# Chez toi, SSL casse pour ANSD/ANStat => exception contrôlée
+NO_SSL_VERIFY_DOMAINS = ("ansd.sn", "anstat.ci")
+
+# Taille des blocs écrits sur disque en mode flux
+CHUNK_SIZE = 1 << 16
+
+# Validateurs HTTP par URL: etag, last_modified, checked_at (le contenu est dans raw_store)
+HTTP_CACHE = Path("data/cache/http_cache.json")
+
+_sessions: dict[str, requests.Session] = {}
+_sessions_lock = threading.Lock()
+_cache: dict | None = None
+_cache_lock = threading.Lock()
+
+
+def host_of(url: str) -> str:
+    return (urlparse(url).hostname or "").lower()
+
+
+def ssl_verify(url: str):
+    """False pour les domaines de NO_SSL_VERIFY_DOMAINS, sinon le bundle certifi."""
+    host = host_of(url)
+    if any(host == d or host.endswith("." + d) for d in NO_SSL_VERIFY_DOMAINS):
+        return False
+    return certifi.where()
+
+
+def get_session(url: str) -> requests.Session:
+    """Session réutilisée par hôte: les connexions TLS restent ouvertes entre deux appels."""
+    host = host_of(url)
+    with _sessions_lock:
+        s = _sessions.get(host)
+        if s is None:
+            s = requests.Session()
+            s.headers.update(HEADERS)
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=FETCH_WORKERS)
+            s.mount("http://", adapter)
+            s.mount("https://", adapter)
+            _sessions[host] = s
+        return s
+
+
+def fetch(url: str, timeout: int = 30, verify=None, headers: dict | None = None, **kwargs) -> requests.Response:
+    """
+    GET via la session de l'hôte. verify=None => règle par domaine (ssl_verify).
+    Débit, retries et disjoncteur gérés par host_scheduler.
+    Lève requests.HTTPError si le statut final n'est pas 2xx/3xx,
+    host_scheduler.HostUnavailable si l'hôte est coupé par le disjoncteur.
+    """
+    if verify is None:
+        verify = ssl_verify(url)
+    target = http_replay.replay_url(url) if http_replay.HTTP_MODE == "replay" else url
+    session = get_session(url)
+    r = host_scheduler.send(
+        host_of(url),
+        lambda: session.get(target, timeout=timeout, verify=verify, headers=headers, **kwargs),
+    )
+    if http_replay.HTTP_MODE == "record":
+        http_replay.record(url, r)
+    r.raise_for_status()
+    return r
+
+
+def run_many(func, jobs: dict, workers: int | None = None, **defaults) -> dict:
+    """
+    Exécute func(**job) pour chaque job dans le pool de threads.
+    jobs: {clé: url} ou {clé: dict de paramètres}. Retourne {clé: résultat | Exception}.
+    """
+    def run(job):
+        params = dict(defaults)
+        if isinstance(job, dict):
+            params.update(job)
+        else:
+            params["url"] = job
+        try:
+            return func(**params)
+        except Exception as e:
+            return e
+
+    if not jobs:
+        return {}
+
+    n = min(workers or FETCH_WORKERS, len(jobs))
+    with ThreadPoolExecutor(max_workers=n) as pool:
+        futures = {key: pool.submit(run, job) for key, job in jobs.items()}
+        return {key: f.result() for key, f in futures.items()}
+
+
+def fetch_many(jobs: dict, workers: int | None = None, **defaults) -> dict:
+    """
+    Télécharge plusieurs URLs en parallèle.
+
+    jobs: {clé: url} ou {clé: {"url": ..., "verify": ..., "timeout": ...}}
+    Retourne {clé: Response | Exception} dans l'ordre de jobs (une erreur ne bloque pas les autres).
+    """
+    return run_many(fetch, jobs, workers, **defaults)
+
+
+# --- Cache HTTP conditionnel (ETag / Last-Modified) ---
+
+def _load_cache() -> dict:
+    global _cache
+    if _cache is None:
+        _cache = json.loads(HTTP_CACHE.read_text(encoding="utf-8")) if HTTP_CACHE.exists() else {}
+    return _cache
+
+
+def _save_cache():
+    HTTP_CACHE.parent.mkdir(parents=True, exist_ok=True)
+    tmp = HTTP_CACHE.with_suffix(".tmp")
+    tmp.write_text(json.dumps(_cache, ensure_ascii=False, indent=1), encoding="utf-8")
+    tmp.replace(HTTP_CACHE)
+
+
+def stream_download(url: str, part: Path, headers: dict | None = None, **kwargs) -> requests.Response | None:
+    """
+    Écrit le corps de url dans `part` par blocs (mémoire constante).
+
+    Si `part` existe déjà (coupure lors d'un run précédent), reprend avec Range: bytes=N-
+    et If-Range (le serveur renvoie tout le fichier si la ressource a changé entre-temps).
+    Demande Accept-Encoding: identity (requests envoie gzip par défaut): les octets écrits sont
+    ceux du serveur, la reprise par Range et le contrôle de taille portent sur les mêmes octets.
+    Vérifie à la fin que la taille correspond à Content-Length / Content-Range.
+    Si le serveur encode quand même (gzip...), pas de reprise possible: la taille est contrôlée
+    sur les octets reçus et le fichier partiel est supprimé en cas d'écart.
+    Retourne la réponse (en-têtes), ou None sur 304.
+    """
+    part = Path(part)
+    part.parent.mkdir(parents=True, exist_ok=True)
+    meta_path = part.with_suffix(".json")
+    meta = json.loads(meta_path.read_text(encoding="utf-8")) if meta_path.exists() else {}
+
+    headers = dict(headers or {})
+    headers["Accept-Encoding"] = "identity"
+    offset = part.stat().st_size if part.exists() else 0
+    if offset and meta.get("validator"):
+        headers["Range"] = f"bytes={offset}-"
+        headers["If-Range"] = meta["validator"]
+    else:
+        offset = 0
+
+    try:
+        r = fetch(url, headers=headers, stream=True, **kwargs)
+    except requests.HTTPError as e:
+        if e.response is not None and e.response.status_code == 416:
+            # Range invalide (fichier partiel corrompu ou déjà complet) => on repart de zéro
+            part.unlink(missing_ok=True)
+            meta_path.unlink(missing_ok=True)
+            headers.pop("Range", None)
+            headers.pop("If-Range", None)
+            return stream_download(url, part, headers=headers, **kwargs)
+        raise
+
+    with r:
+        if r.status_code == 304:
+            return None
+
+        # Accept-Encoding: identity ignoré par le serveur => tailles en octets encodés, pas de reprise
+        encoded = r.headers.get("Content-Encoding", "identity").lower() != "identity"
+        total = r.headers.get("Content-Range", "").rsplit("/", 1)[-1]
+        if r.status_code == 206 and not encoded:
+            mode = "ab"
+            expected = int(total) if total.isdigit() else None
+        else:
+            mode, offset = "wb", 0
+            expected = int(r.headers["Content-Length"]) if r.headers.get("Content-Length", "").isdigit() else None
+
+        validator = r.headers.get("ETag") or r.headers.get("Last-Modified")
+        if validator and not encoded:
+            meta_path.write_text(json.dumps({"url": url, "validator": validator}), encoding="utf-8")
+        else:
+            meta_path.unlink(missing_ok=True)
+
+        with open(part, mode) as f:
+            for chunk in r.iter_content(chunk_size=CHUNK_SIZE):
+                f.write(chunk)
+
+        # octets reçus sur le réseau (avant décompression) si encodé, sinon taille du fichier
+        size = r.raw.tell() if encoded else part.stat().st_size
+
+    if expected is not None and size != expected:
+        if encoded:
+            part.unlink(missing_ok=True)
+            raise IOError(f"Téléchargement incomplet: {size}/{expected} octets encodés ({url}) - sera relancé au prochain run")
+        raise IOError(f"Téléchargement incomplet: {size}/{expected} octets ({url}) - sera repris au prochain run")
+
+    meta_path.unlink(missing_ok=True)
+    return r
+
+
+def fetch_conditional(url: str, key: str, suffix: str = "", as_text: bool = False, stream: bool = False, **kwargs) -> tuple[Path, bool]:
+    """
+    GET conditionnel stocké dans raw_store sous la clé source `key`.
+    Envoie If-None-Match / If-Modified-Since si une copie de cette source existe déjà.
+
+    - 304, ou contenu identique au dernier blob => (blob existant, False)
+    - sinon nouveau blob => (blob, True)
+
+    as_text=True stocke r.text en UTF-8 (comme les scripts HTML), sinon les octets bruts.
+    stream=True passe par stream_download (gros fichiers, reprise après coupure).
+    """
+    with _cache_lock:
+        entry = dict(_load_cache().get(url, {}))
+
+    stored = raw_store.latest(key)
+
+    headers = dict(kwargs.pop("headers", None) or {})
+    if stored is not None:
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+
+    if stream:
+        part = raw_store.PARTIAL_DIR / (hashlib.sha1(url.encode("utf-8")).hexdigest() + ".part")
+        r = stream_download(url, part, headers=headers, **kwargs)
+    else:
+        r = fetch(url, headers=headers, **kwargs)
+
+    if r is None or (r.status_code == 304 and stored is not None):
+        path, changed = stored, False
+    else:
+        if stream:
+            path, changed = raw_store.put_file(key, part, url=url, suffix=suffix)
+        else:
+            body = r.text.encode("utf-8") if as_text else r.content
+            path, changed = raw_store.put(key, body, url=url, suffix=suffix)
+        entry["etag"] = r.headers.get("ETag")
+        entry["last_modified"] = r.headers.get("Last-Modified")
+
+    entry["checked_at"] = datetime.now().isoformat(timespec="seconds")
+
+    with _cache_lock:
+        _load_cache()[url] = entry
+        _save_cache()
+
+    return path, changed
+
+
+def fetch_many_conditional(jobs: dict, workers: int | None = None, **defaults) -> dict:
+    """
+    fetch_conditional en parallèle.
+
+    jobs: {clé source: url} ou {clé source: {"url": ..., "suffix": ..., ...}}
+    Retourne {clé: (Path, changed) | Exception}.
+    """
+    jobs = {k: {"key": k, **(job if isinstance(job, dict) else {"url": job})} for k, job in jobs.items()}
+    return run_many(fetch_conditional, jobs, workers, **defaults)
+
+
+def print_change_report(results: dict):
+    """Résumé: quelles sources ont réellement changé depuis le dernier run."""
+    changed = [k for k, v in results.items() if isinstance(v, tuple) and v[1]]
+    unchanged = [k for k, v in results.items() if isinstance(v, tuple) and not v[1]]
+    errors = [k for k, v in results.items() if isinstance(v, Exception)]
+    print(f"\nSources modifiées: {len(changed)} | inchangées: {len(unchanged)} | erreurs: {len(errors)}")
+    for k in changed:
+        print("  CHANGED ->", k)
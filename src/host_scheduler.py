@@ -0,0 +1,176 @@
+"""
+Ordonnanceur par hôte utilisé par fetcher.fetch pour chaque requête.
+
+- limite de débit par hôte (token bucket): HOST_RATE requêtes/s, rafale HOST_BURST
+- retry avec backoff exponentiel + jitter sur 429 / 5xx / timeouts / coupures,
+  en respectant Retry-After quand le serveur l'envoie
+- disjoncteur (circuit breaker): après CIRCUIT_THRESHOLD échecs consécutifs,
+  l'hôte est ignoré pendant CIRCUIT_COOLDOWN secondes au lieu de consommer le temps du run;
+  ensuite (semi-ouvert) une seule requête d'essai passe, les autres restent refusées jusqu'à
+  son résultat: succès => refermé, échec => rouvert pour un cooldown
+- erreurs SSL (certificat invalide...): ni retry ni échec compté, une nouvelle tentative
+  donnerait le même résultat
+"""
+import os
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+import requests
+
+HOST_RATE = float(os.environ.get("UEMOA_HOST_RATE", "2"))  # requêtes / seconde / hôte
+HOST_BURST = int(os.environ.get("UEMOA_HOST_BURST", "4"))
+
+# Sites gouvernementaux plus fragiles: débit réduit
+HOST_RATE_OVERRIDES = {
+    "www.anstat.ci": 1.0,
+    "www.ansd.sn": 1.0,
+}
+
+MAX_RETRIES = int(os.environ.get("UEMOA_MAX_RETRIES", "4"))
+BACKOFF_BASE = 1.0   # secondes
+BACKOFF_MAX = 30.0
+RETRY_AFTER_MAX = 120.0
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+CIRCUIT_THRESHOLD = 5
+CIRCUIT_COOLDOWN = 120.0
+
+
+class HostUnavailable(requests.ConnectionError):
+    """Disjoncteur ouvert: l'hôte a trop échoué, la requête n'est pas envoyée."""
+
+
+class HostState:
+    def __init__(self, host: str):
+        self.host = host
+        self.rate = HOST_RATE_OVERRIDES.get(host, HOST_RATE)
+        self.tokens = float(HOST_BURST)
+        self.updated = time.monotonic()
+        self.failures = 0
+        self.open_until = 0.0
+        self.probing = False  # semi-ouvert: requête d'essai en cours
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """Bloque jusqu'à ce qu'un jeton soit disponible pour cet hôte."""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(HOST_BURST, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+    def check_circuit(self) -> bool:
+        """Lève HostUnavailable si le disjoncteur refuse la requête. True si c'est la requête d'essai."""
+        with self.lock:
+            if self.failures < CIRCUIT_THRESHOLD:
+                return False
+            remaining = self.open_until - time.monotonic()
+            if remaining <= 0 and not self.probing:
+                self.probing = True
+                return True
+        if remaining > 0:
+            raise HostUnavailable(f"{self.host}: disjoncteur ouvert ({self.failures} échecs), réessai dans {remaining:.0f}s")
+        raise HostUnavailable(f"{self.host}: disjoncteur semi-ouvert, requête d'essai en cours")
+
+    def end_probe(self):
+        """Requête d'essai terminée sans verdict (erreur non comptée): un autre essai peut passer."""
+        with self.lock:
+            self.probing = False
+
+    def record_success(self):
+        with self.lock:
+            self.failures = 0
+            self.open_until = 0.0
+            self.probing = False
+
+    def record_failure(self):
+        with self.lock:
+            self.failures += 1
+            self.probing = False
+            if self.failures >= CIRCUIT_THRESHOLD:
+                # ouvert, ou requête d'essai échouée: rouvert pour un cooldown complet
+                self.open_until = time.monotonic() + CIRCUIT_COOLDOWN
+
+
+_states: dict[str, HostState] = {}
+_states_lock = threading.Lock()
+
+
+def host_state(host: str) -> HostState:
+    with _states_lock:
+        state = _states.get(host)
+        if state is None:
+            state = _states[host] = HostState(host)
+        return state
+
+
+def backoff_delay(attempt: int) -> float:
+    """Backoff exponentiel avec jitter complet: uniforme dans [0, min(MAX, BASE * 2^attempt)]."""
+    return random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * (2 ** attempt)))
+
+
+def retry_after(response: requests.Response) -> float | None:
+    """Retry-After en secondes (entier ou date HTTP), borné par RETRY_AFTER_MAX."""
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        seconds = float(value)
+    except ValueError:
+        try:
+            seconds = (parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds()
+        except (TypeError, ValueError):
+            return None
+    return max(0.0, min(seconds, RETRY_AFTER_MAX))
+
+
+def send(host: str, do_request) -> requests.Response:
+    """
+    Exécute do_request() (-> Response) sous la politique de l'hôte: débit, retries, disjoncteur.
+    La réponse finale est retournée telle quelle (raise_for_status reste à l'appelant).
+    """
+    state = host_state(host)
+
+    for attempt in range(MAX_RETRIES + 1):
+        probe = state.check_circuit()
+
+        try:
+            state.acquire()
+            r = do_request()
+        except requests.exceptions.SSLError:
+            # sous-classe de ConnectionError: ni retry ni échec compté (réponse identique à chaque essai)
+            if probe:
+                state.end_probe()
+            raise
+        except (requests.Timeout, requests.ConnectionError) as e:
+            state.record_failure()
+            if attempt == MAX_RETRIES:
+                raise
+            delay = backoff_delay(attempt)
+            print(f"RETRY -> {host} | {type(e).__name__} | tentative {attempt + 1}/{MAX_RETRIES} dans {delay:.1f}s")
+        except BaseException:
+            if probe:
+                state.end_probe()
+            raise
+        else:
+            if r.status_code not in RETRY_STATUSES:
+                state.record_success()
+                return r
+            state.record_failure()
+            if attempt == MAX_RETRIES:
+                return r
+            delay = retry_after(r)
+            if delay is None:
+                delay = backoff_delay(attempt)
+            r.close()
+            print(f"RETRY -> {host} | HTTP {r.status_code} | tentative {attempt + 1}/{MAX_RETRIES} dans {delay:.1f}s")
+
+        time.sleep(delay)
@@ -0,0 +1,195 @@
+"""
+Enregistrement / rejeu HTTP pour des runs hors ligne et des benchmarks reproductibles.
+
+Un seul réglage, la variable d'environnement UEMOA_HTTP_MODE:
+- "live"   (défaut) : requêtes vers les vrais sites
+- "record" : requêtes réelles + copie de chaque réponse (statut, en-têtes, corps) dans FIXTURE_DIR,
+             corps copié au fil de la lecture (gros PDF en stream: mémoire constante)
+- "replay" : fetcher envoie tout vers un serveur HTTP local qui rejoue les fixtures
+             (ETag / If-None-Match et Range gérés comme un vrai serveur)
+
+Options du rejeu (pour simuler des sites lents ou instables):
+- UEMOA_REPLAY_LATENCY_MS : latence ajoutée à chaque réponse
+- UEMOA_REPLAY_ERROR_RATE : proportion de réponses 503 injectées (0..1)
+- UEMOA_REPLAY_SEED       : graine du tirage des erreurs (runs déterministes)
+
+Usage:
+    UEMOA_HTTP_MODE=record python src/09_fetch_inflation_pdfs.py
+    UEMOA_HTTP_MODE=replay UEMOA_REPLAY_LATENCY_MS=200 python src/09_fetch_inflation_pdfs.py
+    python src/http_replay.py   # liste les fixtures enregistrées
+"""
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+HTTP_MODE = os.environ.get("UEMOA_HTTP_MODE", "live").lower()
+
+FIXTURE_DIR = Path(os.environ.get("UEMOA_FIXTURE_DIR", "data/fixtures/http"))
+
+REPLAY_LATENCY = float(os.environ.get("UEMOA_REPLAY_LATENCY_MS", "0")) / 1000
+REPLAY_ERROR_RATE = float(os.environ.get("UEMOA_REPLAY_ERROR_RATE", "0"))
+REPLAY_SEED = int(os.environ.get("UEMOA_REPLAY_SEED", "0"))
+
+# En-têtes conservés dans les fixtures
+KEPT_HEADERS = ("Content-Type", "ETag", "Last-Modified", "Retry-After")
+
+_server: ThreadingHTTPServer | None = None
+_server_lock = threading.Lock()
+_rng = random.Random(REPLAY_SEED)
+_rng_lock = threading.Lock()
+
+
+def fixture_id(url: str) -> str:
+    return hashlib.sha1(url.encode("utf-8")).hexdigest()
+
+
+def _write_meta(fid: str, url: str, response, size: int):
+    meta = {
+        "url": url,
+        "status": response.status_code,
+        "headers": {h: response.headers[h] for h in KEPT_HEADERS if h in response.headers},
+        "size": size,
+    }
+    (FIXTURE_DIR / f"{fid}.json").write_text(json.dumps(meta, ensure_ascii=False, indent=1), encoding="utf-8")
+
+
+def record(url: str, response):
+    """
+    Sauve la réponse finale (après retries).
+    - 206 ignorés; 304 sauvés seulement s'il n'y a pas déjà de fixture complète (source servie
+      depuis le cache pendant l'enregistrement: le rejeu renverra 304 au lieu de 404)
+    - corps non encore lu (stream=True): copié sur disque au fil de iter_content (mémoire
+      constante), fixture écrite seulement si le corps a été lu jusqu'au bout
+    """
+    fid = fixture_id(url)
+    if response.status_code == 206:
+        return
+    if response.status_code == 304 and (FIXTURE_DIR / f"{fid}.json").exists():
+        return
+    FIXTURE_DIR.mkdir(parents=True, exist_ok=True)
+    body_path = FIXTURE_DIR / f"{fid}.body"
+
+    # requests: _content reste False tant qu'un corps en stream n'a pas été lu
+    if response._content is not False:
+        body = response.content or b""
+        body_path.write_bytes(body)
+        _write_meta(fid, url, response, len(body))
+        return
+
+    iter_content = response.iter_content
+
+    def tee(chunk_size=1, decode_unicode=False):
+        if decode_unicode:
+            yield from iter_content(chunk_size=chunk_size, decode_unicode=True)
+            return
+        tmp = FIXTURE_DIR / f".{fid}.body.tmp"
+        size, done = 0, False
+        try:
+            with open(tmp, "wb") as f:
+                for chunk in iter_content(chunk_size=chunk_size):
+                    f.write(chunk)
+                    size += len(chunk)
+                    yield chunk
+            done = True
+        finally:
+            if done:
+                tmp.replace(body_path)
+                _write_meta(fid, url, response, size)
+            else:
+                tmp.unlink(missing_ok=True)
+
+    # response.content passe aussi par self.iter_content: une seule interception
+    response.iter_content = tee
+
+
+class ReplayHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if REPLAY_LATENCY:
+            time.sleep(REPLAY_LATENCY)
+
+        with _rng_lock:
+            inject_error = REPLAY_ERROR_RATE and _rng.random() < REPLAY_ERROR_RATE
+        if inject_error:
+            self._send(503, {"Retry-After": "0"}, b"")
+            return
+
+        fid = self.path.lstrip("/")
+        meta_path = FIXTURE_DIR / f"{fid}.json"
+        if not meta_path.exists():
+            self._send(404, {"Content-Type": "text/plain"}, b"fixture absente (URL non enregistree)")
+            return
+
+        meta = json.loads(meta_path.read_text(encoding="utf-8"))
+        body = (FIXTURE_DIR / f"{fid}.body").read_bytes()
+        headers = dict(meta["headers"])
+        validator = headers.get("ETag") or headers.get("Last-Modified")
+
+        if meta["status"] == 304:
+            # enregistré depuis le cache HTTP: seule la revalidation a été vue
+            self._send(304, headers, b"")
+            return
+
+        if meta["status"] == 200:
+            if headers.get("ETag") and self.headers.get("If-None-Match") == headers["ETag"]:
+                self._send(304, {"ETag": headers["ETag"]}, b"")
+                return
+            if not headers.get("ETag") and headers.get("Last-Modified") and self.headers.get("If-Modified-Since") == headers["Last-Modified"]:
+                self._send(304, {"Last-Modified": headers["Last-Modified"]}, b"")
+                return
+
+            rng = self.headers.get("Range", "")
+            if_range = self.headers.get("If-Range")
+            if rng.startswith("bytes=") and rng.endswith("-") and (if_range is None or if_range == validator):
+                start = int(rng[len("bytes="):-1])
+                if start >= len(body):
+                    self._send(416, {"Content-Range": f"bytes */{len(body)}"}, b"")
+                    return
+                headers["Content-Range"] = f"bytes {start}-{len(body) - 1}/{len(body)}"
+                self._send(206, headers, body[start:])
+                return
+
+        self._send(meta["status"], headers, body)
+
+    def _send(self, status: int, headers: dict, body: bytes):
+        self.send_response(status)
+        for k, v in headers.items():
+            self.send_header(k, v)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def start_server() -> ThreadingHTTPServer:
+    """Démarre (une fois) le serveur de rejeu sur un port libre, dans un thread démon."""
+    global _server
+    with _server_lock:
+        if _server is None:
+            _server = ThreadingHTTPServer(("127.0.0.1", 0), ReplayHandler)
+            _server.daemon_threads = True
+            threading.Thread(target=_server.serve_forever, daemon=True).start()
+        return _server
+
+
+def replay_url(url: str) -> str:
+    host, port = start_server().server_address
+    return f"http://{host}:{port}/{fixture_id(url)}"
+
+
+def main():
+    metas = sorted(FIXTURE_DIR.glob("*.json"))
+    print(f"\n=== FIXTURES HTTP ({FIXTURE_DIR}) : {len(metas)} ===\n")
+    for p in metas:
+        meta = json.loads(p.read_text(encoding="utf-8"))
+        print(f"{meta['status']} | {meta['size']:>10} o | {meta['url']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,214 @@
+"""
+Backend SQLite du dataset macro (optionnel): data/processed/macro_uemoa.sqlite.
+
+Activé par UEMOA_MACRO_BACKEND=sqlite (défaut: csv, cf. macro_store.open_store()).
+Même interface que macro_store.MacroStore (get, unchanged, upsert, delete_where, select,
+frame, save), les scripts n'ont pas à savoir quel backend est utilisé.
+
+- contrainte UNIQUE(country, indicator, date_reference): pas de doublon possible
+- upsert = INSERT ... ON CONFLICT DO UPDATE (ligne entière remplacée, comme en CSV)
+- mode WAL + busy_timeout: lecteurs et écrivains concurrents, plusieurs étapes d'extraction
+  peuvent tourner en parallèle sans écraser les écritures des autres
+- un lot = une transaction (BEGIN IMMEDIATE au premier écrit, COMMIT dans save())
+- index par pays et par indicateur: select(country=..., indicator=..., since=...) sans tout charger
+- colonnes inconnues ajoutées à la volée (ALTER TABLE), comme le schéma souple du CSV
+
+Usage:
+    python src/macro_db.py import-csv   # charge macro_uemoa.csv dans la base (upsert)
+    python src/macro_db.py export-csv   # réécrit macro_uemoa.csv depuis la base (compatibilité)
+"""
+import math
+import os
+import sqlite3
+import sys
+from pathlib import Path
+
+import pandas as pd
+
+import macro_store
+
+DB_PATH = Path(os.environ.get("UEMOA_MACRO_DB", "data/processed/macro_uemoa.sqlite"))
+BUSY_TIMEOUT_MS = int(os.environ.get("UEMOA_MACRO_DB_TIMEOUT_MS", "30000"))
+
+TABLE = "macro"
+
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS {TABLE} (
+    country        TEXT NOT NULL,
+    indicator      TEXT NOT NULL,
+    value          REAL,
+    unit           TEXT,
+    date_reference TEXT NOT NULL,
+    source_name    TEXT,
+    source_url     TEXT,
+    collected_at   TEXT,
+    comment        TEXT,
+    UNIQUE (country, indicator, date_reference)
+);
+CREATE INDEX IF NOT EXISTS idx_{TABLE}_country ON {TABLE} (country, date_reference);
+CREATE INDEX IF NOT EXISTS idx_{TABLE}_indicator ON {TABLE} (indicator, date_reference);
+"""
+
+
+def _quote(name: str) -> str:
+    return '"' + str(name).replace('"', '""') + '"'
+
+
+def _sql_value(v):
+    # numpy -> type Python; NaN / None -> NULL
+    if hasattr(v, "item"):
+        v = v.item()
+    if v is None or (isinstance(v, float) and math.isnan(v)):
+        return None
+    return v
+
+
+def connect(path: Path = DB_PATH) -> sqlite3.Connection:
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(path, timeout=BUSY_TIMEOUT_MS / 1000, isolation_level=None)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute(f"PRAGMA busy_timeout={BUSY_TIMEOUT_MS}")
+    conn.executescript(SCHEMA)
+    return conn
+
+
+class SqliteStore:
+    def __init__(self, path: Path = DB_PATH):
+        self.path = Path(path)
+        self.conn = connect(self.path)
+        self._columns = self._table_columns()
+
+    def _table_columns(self) -> list[str]:
+        return [r[1] for r in self.conn.execute(f"PRAGMA table_info({TABLE})")]
+
+    def _begin(self):
+        # verrou d'écriture pris au premier écrit du lot, relâché par save()
+        if not self.conn.in_transaction:
+            self.conn.execute("BEGIN IMMEDIATE")
+
+    def _ensure_columns(self, cols):
+        for c in cols:
+            if c not in self._columns:
+                self._begin()
+                self.conn.execute(f"ALTER TABLE {TABLE} ADD COLUMN {_quote(c)}")
+                self._columns.append(c)
+
+    def _select(self, where: str = "", params=()) -> pd.DataFrame:
+        df = pd.read_sql_query(f"SELECT * FROM {TABLE} {where}", self.conn, params=params)
+        return df.astype({c: str for c in macro_store.KEY_COLS})
+
+    def __len__(self):
+        return self.conn.execute(f"SELECT COUNT(*) FROM {TABLE}").fetchone()[0]
+
+    def _exists(self, key: tuple) -> bool:
+        where = " AND ".join(f"{c} = ?" for c in macro_store.KEY_COLS)
+        return self.conn.execute(f"SELECT 1 FROM {TABLE} WHERE {where}", tuple(str(k) for k in key)).fetchone() is not None
+
+    def get(self, key: tuple) -> dict | None:
+        where = " AND ".join(f"{c} = ?" for c in macro_store.KEY_COLS)
+        df = self._select(f"WHERE {where}", tuple(str(k) for k in key))
+        return df.iloc[0].to_dict() if len(df) else None
+
+    def unchanged(self, rows) -> bool:
+        """True si toutes les lignes sont déjà présentes à l'identique (hors collected_at)."""
+        rows = rows.to_dict("records") if isinstance(rows, pd.DataFrame) else list(rows)
+        if not rows:
+            return False
+        for row in rows:
+            current = self.get(macro_store._key(row))
+            if current is None:
+                return False
+            if not macro_store.same_row(row, current):
+                return False
+        return True
+
+    def upsert(self, rows) -> dict:
+        """INSERT ... ON CONFLICT DO UPDATE pour tout le lot. Retourne {"inserted", "updated"}."""
+        rows = rows.to_dict("records") if isinstance(rows, pd.DataFrame) else list(rows)
+        if not rows:
+            return {"inserted": 0, "updated": 0}
+        self._ensure_columns(c for row in rows for c in row)
+        self._begin()
+
+        keys = {macro_store._key(row) for row in rows}
+        inserted = sum(1 for key in keys if not self._exists(key))
+        cols = list(self._columns)
+        updates = ", ".join(f"{_quote(c)} = excluded.{_quote(c)}" for c in cols if c not in macro_store.KEY_COLS)
+        sql = (
+            f"INSERT INTO {TABLE} ({', '.join(_quote(c) for c in cols)}) VALUES ({', '.join('?' for _ in cols)}) "
+            f"ON CONFLICT ({', '.join(macro_store.KEY_COLS)}) DO UPDATE SET {updates}"
+        )
+        self.conn.executemany(sql, [
+            tuple(str(row.get(c)) if c in macro_store.KEY_COLS else _sql_value(row.get(c)) for c in cols)
+            for row in rows
+        ])
+        return {"inserted": inserted, "updated": len(rows) - inserted}
+
+    def delete_where(self, **equals) -> int:
+        if any(c not in self._columns for c in equals):
+            return 0
+        self._begin()
+        where = " AND ".join(f"{_quote(c)} = ?" for c in equals)
+        return self.conn.execute(f"DELETE FROM {TABLE} WHERE {where}", tuple(str(v) for v in equals.values())).rowcount
+
+    def select(self, country: str | None = None, indicator: str | None = None, since: str | None = None) -> pd.DataFrame:
+        """Lignes filtrées (index country / indicator), since = date_reference minimale ("2020", "2020-01")."""
+        clauses, params = [], []
+        for col, value in (("country", country), ("indicator", indicator)):
+            if value is not None:
+                clauses.append(f"{col} = ?")
+                params.append(value)
+        if since is not None:
+            clauses.append("date_reference >= ?")
+            params.append(str(since))
+        where = "WHERE " + " AND ".join(clauses) if clauses else ""
+        return self._select(where + " ORDER BY country, indicator, date_reference", params)
+
+    def frame(self) -> pd.DataFrame:
+        return self._select("ORDER BY rowid")
+
+    def save(self):
+        if self.conn.in_transaction:
+            self.conn.execute("COMMIT")
+
+    def close(self):
+        self.save()
+        self.conn.close()
+
+
+def import_csv(csv_path: Path = macro_store.OUT_CSV, db_path: Path = DB_PATH) -> dict:
+    store = SqliteStore(db_path)
+    counts = store.upsert(macro_store.load_df(csv_path))
+    store.close()
+    return counts
+
+
+def export_csv(csv_path: Path = macro_store.OUT_CSV, db_path: Path = DB_PATH) -> int:
+    store = SqliteStore(db_path)
+    df = store.frame()
+    store.close()
+    csv_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = csv_path.with_suffix(".tmp")
+    df.to_csv(tmp, index=False)
+    tmp.replace(csv_path)
+    return len(df)
+
+
+def main():
+    command = sys.argv[1] if len(sys.argv) > 1 else ""
+    if command == "import-csv":
+        counts = import_csv()
+        print(f"OK -> {macro_store.OUT_CSV} importé dans {DB_PATH}: {counts['inserted']} nouvelle(s), {counts['updated']} mise(s) à jour")
+    elif command == "export-csv":
+        n = export_csv()
+        print(f"OK -> {n} ligne(s) exportée(s) de {DB_PATH} vers {macro_store.OUT_CSV}")
+    else:
+        print("Usage: python src/macro_db.py import-csv | export-csv")
+        return 2
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
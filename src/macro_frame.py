@@ -0,0 +1,156 @@
+"""
+Modèle mémoire compact et typé des observations macro (analyse sur tout le dataset).
+
+pd.read_csv(macro_uemoa.csv) garde chaque colonne texte en objets Python: "Côte d’Ivoire",
+les libellés d'indicateurs, les URLs et surtout les commentaires de provenance sont répétés
+ligne après ligne. MacroFrame garde:
+- dimensions (country, indicator, unit, source_name, source_url) en catégories (dictionnaire)
+- date_reference en catégorie + period (datetime64, début de période) + freq ("A" année,
+  "M" mois, "D" jour; vide si format non reconnu, ex. "2025-novembre"), parsés une fois
+  par valeur distincte
+- value en float64, collected_at en datetime64
+- comment dans une table à part (comments), référencé par comment_id (int32, -1 = vide)
+
+Groupby / filtres sur les codes des catégories: plus rapides et sans copie des chaînes.
+
+Usage:
+    frame = macro_frame.load()
+    frame.filter(country="Côte d’Ivoire", since="2020").obs.groupby("indicator", observed=True)["value"].mean()
+    python src/macro_frame.py   # mémoire et temps: CSV brut vs MacroFrame
+"""
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+import macro_store
+
+DIMENSIONS = ["country", "indicator", "unit", "source_name", "source_url"]
+
+FREQS = [(r"\d{4}", "A"), (r"\d{4}-\d{2}", "M"), (r"\d{4}-\d{2}-\d{2}", "D")]
+
+
+def _periods(date_reference: pd.Categorical) -> tuple[np.ndarray, pd.Categorical]:
+    """(period, freq) calculés sur les valeurs distinctes puis étendus par les codes."""
+    cats = pd.Series(date_reference.categories.astype(str))
+    starts = macro_store.reference_dates(cats).astype("datetime64[s]").to_numpy()
+    freqs = pd.Series(pd.NA, index=cats.index, dtype="object")
+    for regex, freq in FREQS:
+        freqs[cats.str.fullmatch(regex)] = freq
+    # code -1 (date manquante) -> dernier élément: NaT / -1 ajoutés en fin (marche aussi sans catégorie)
+    codes = date_reference.codes
+    period = np.append(starts, np.datetime64("NaT", "s"))[codes]
+    freq_codes = np.append(pd.Categorical(freqs, categories=["A", "M", "D"]).codes, -1)[codes]
+    freq = pd.Categorical.from_codes(freq_codes, categories=["A", "M", "D"])
+    return period, freq
+
+
+class MacroFrame:
+    def __init__(self, obs: pd.DataFrame, comments: pd.Index):
+        self.obs = obs            # une ligne par observation, colonnes typées
+        self.comments = comments  # comment_id -> texte
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame) -> "MacroFrame":
+        df = df.reindex(columns=list(dict.fromkeys(macro_store.COLUMNS + list(df.columns))))
+        date_reference = pd.Categorical(df["date_reference"].astype("string"))
+        period, freq = _periods(date_reference)
+        comment_id, comments = pd.factorize(df["comment"], use_na_sentinel=True)
+
+        obs = pd.DataFrame({
+            **{c: pd.Categorical(df[c]) for c in DIMENSIONS},
+            "date_reference": date_reference,
+            "period": period,
+            "freq": freq,
+            "value": pd.to_numeric(df["value"], errors="coerce").astype("float64"),
+            # utc=True: valeurs avec et sans fuseau mélangées (ramenées en UTC, puis naïves)
+            "collected_at": pd.to_datetime(df["collected_at"], format="ISO8601", errors="coerce", utc=True)
+            .dt.tz_localize(None).astype("datetime64[s]"),
+            "comment_id": comment_id.astype("int32"),
+        })
+        # colonnes hors schéma (schéma souple du store): catégories aussi
+        for c in df.columns:
+            if c not in obs.columns and c != "comment":
+                obs[c] = pd.Categorical(df[c])
+        return cls(obs, pd.Index(comments, dtype="object"))
+
+    def __len__(self):
+        return len(self.obs)
+
+    def memory_bytes(self) -> int:
+        return int(self.obs.memory_usage(deep=True).sum() + self.comments.memory_usage(deep=True))
+
+    def filter(self, country: str | None = None, indicator: str | None = None, since=None) -> "MacroFrame":
+        """Sous-ensemble (la table des commentaires est partagée); since = "2020", "2020-06" ou date.
+        ValueError si since n'est pas reconnu ("2020-novembre")."""
+        mask = np.ones(len(self.obs), dtype=bool)
+        for col, value in (("country", country), ("indicator", indicator)):
+            if value is not None:
+                mask &= (self.obs[col] == value).to_numpy()
+        if since is not None:
+            start = macro_store.reference_dates(pd.Series([str(since)])).iloc[0]
+            if pd.isna(start):
+                raise ValueError(f"since non reconnu: {since!r} (attendu \"2020\", \"2020-01\", \"2020-01-15\" ou date)")
+            mask &= (self.obs["period"] >= start).to_numpy()
+        return MacroFrame(self.obs[mask], self.comments)
+
+    def comment(self, comment_id: int) -> str | None:
+        return None if comment_id < 0 else self.comments[comment_id]
+
+    def to_frame(self) -> pd.DataFrame:
+        """Retour au format du store (colonnes texte, comment en clair)."""
+        ids = self.obs["comment_id"].to_numpy()
+        comments = np.append(self.comments.to_numpy(dtype=object), None)
+        df = self.obs.drop(columns=["period", "freq", "comment_id"]).assign(comment=comments[ids])
+        extra = [c for c in df.columns if c not in macro_store.COLUMNS]
+        return df[macro_store.COLUMNS + extra].astype({c: "object" for c in DIMENSIONS + ["date_reference"]})
+
+
+def load(path: Path = macro_store.OUT_CSV) -> MacroFrame:
+    """macro_uemoa.csv -> MacroFrame (dimensions lues directement en catégories)."""
+    df = pd.read_csv(path, dtype={**{c: "category" for c in DIMENSIONS}, "date_reference": "category"})
+    return MacroFrame.from_frame(df)
+
+
+def main():
+    path = macro_store.OUT_CSV
+    if not path.exists():
+        raise FileNotFoundError(f"Fichier introuvable : {path}")
+
+    start = time.perf_counter()
+    raw = pd.read_csv(path, dtype=object)
+    raw["value"] = pd.to_numeric(raw["value"], errors="coerce")
+    raw_s = time.perf_counter() - start
+    start = time.perf_counter()
+    frame = load(path)
+    frame_s = time.perf_counter() - start
+
+    raw_mb = raw.memory_usage(deep=True).sum() / 1e6
+    frame_mb = frame.memory_bytes() / 1e6
+    print(f"\n=== MacroFrame : {len(frame)} observations, {len(frame.comments)} commentaire(s) distinct(s) ===\n")
+    print(f"Chargement : CSV objets {raw_s * 1000:.0f} ms | MacroFrame {frame_s * 1000:.0f} ms")
+    print(f"Mémoire    : CSV objets {raw_mb:.1f} Mo | MacroFrame {frame_mb:.1f} Mo | x{raw_mb / max(frame_mb, 1e-9):.1f}")
+
+    country, indicator = raw["country"].iloc[0], raw["indicator"].iloc[0]
+    timings = {}
+    for label, run in (
+        ("groupby (country, indicator) mean", (
+            lambda: raw.groupby(["country", "indicator"])["value"].mean(),
+            lambda: frame.obs.groupby(["country", "indicator"], observed=True)["value"].mean(),
+        )),
+        ("filtre country + indicator", (
+            lambda: raw[(raw["country"] == country) & (raw["indicator"] == indicator)],
+            lambda: frame.filter(country=country, indicator=indicator),
+        )),
+    ):
+        for name, func in zip(("csv", "frame"), run):
+            start = time.perf_counter()
+            for _ in range(5):
+                func()
+            timings[(label, name)] = (time.perf_counter() - start) / 5 * 1000
+        print(f"{label:<36}: CSV objets {timings[(label, 'csv')]:.1f} ms | MacroFrame {timings[(label, 'frame')]:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,240 @@
+"""
+Journal d'écriture append-only du dataset macro + compaction (backend UEMOA_MACRO_BACKEND=log).
+
+Au lieu de réécrire macro_uemoa.csv à chaque upsert:
+- save() écrit seulement les lignes du lot dans un nouveau segment
+  data/processed/macro_log/segment-<horodatage>-<pid>.csv (tmp + rename: un crash ne laisse
+  jamais de segment à moitié écrit). Coût O(lignes nouvelles).
+- suppressions (delete_where) = lignes "tombstone" (_op = delete) dans le segment
+- lecture = snapshot (macro_uemoa.csv) + segments non fusionnés, dernière version par clé:
+  la plus récente selon collected_at gagne, à égalité la dernière écrite (keep-last)
+- LogStore.upsert applique la même règle: une ligne plus ancienne (collected_at) que la version
+  courante ou que sa suppression est ignorée (comptée dans "stale"), l'écrivain voit donc
+  la même table que les lecteurs
+- ouvrir un LogStore coûte O(table): lecture du snapshot + des segments non fusionnés (index
+  des clés pour upsert / unchanged). Le gain est à l'écriture: save() = O(lot), sans réécriture
+- compact(): fusionne snapshot + segments en un nouveau snapshot dédoublonné, puis supprime
+  les segments fusionnés. Une seule réécriture par compaction (pas par ligne).
+  Lancée par save() au-delà de COMPACT_SEGMENTS segments dans un processus détaché
+  (python macro_log.py compact --no-wait): l'écrivain ne paie pas la réécriture O(table), et
+  rien n'est fait si une autre compaction tourne déjà. À la main: python src/macro_log.py compact
+
+macro_uemoa.csv reste lisible par les anciens lecteurs (06, 19, notebooks): il est à jour
+après chaque compaction.
+"""
+import os
+import subprocess
+import sys
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+
+import pandas as pd
+
+import macro_store
+
+try:
+    import fcntl
+except ImportError:  # Windows: pas de verrou inter-processus
+    fcntl = None
+
+LOG_DIR = Path(os.environ.get("UEMOA_MACRO_LOG_DIR", "data/processed/macro_log"))
+COMPACT_SEGMENTS = int(os.environ.get("UEMOA_LOG_COMPACT_SEGMENTS", "50"))  # 0 = jamais automatique
+
+OP_COL = "_op"
+OP_DELETE = "delete"
+
+
+def segments(log_dir: Path = LOG_DIR) -> list[Path]:
+    """Segments dans l'ordre d'écriture (nom = horodatage + pid)."""
+    return sorted(log_dir.glob("segment-*.csv"))
+
+
+def _read_segment(path: Path) -> pd.DataFrame:
+    return pd.read_csv(path, dtype={c: str for c in macro_store.KEY_COLS})
+
+
+def collected(value) -> pd.Timestamp:
+    """collected_at -> horodatage UTC comparable (NaT si absent / illisible: le plus ancien)."""
+    if value is None or (not isinstance(value, str) and pd.isna(value)):
+        return pd.NaT
+    return pd.to_datetime(value, format="ISO8601", errors="coerce", utc=True)
+
+
+def older(a, b) -> bool:
+    """collected_at a strictement plus ancien que b, NaT = le plus ancien (même ordre que merge)."""
+    a, b = collected(a), collected(b)
+    if pd.isna(b):
+        return False
+    return pd.isna(a) or a < b
+
+
+def merge(frames: list[pd.DataFrame], tombstones: bool = False) -> pd.DataFrame:
+    """Dernière version par clé (collected_at le plus récent, puis ordre d'écriture), tombstones retirés
+    (gardés, colonne _op, si tombstones=True)."""
+    frames = [f for f in frames if len(f)]
+    if not frames:
+        return pd.DataFrame(columns=macro_store.COLUMNS + ([OP_COL] if tombstones else []))
+    df = pd.concat(frames, ignore_index=True)
+    # utc=True: collected_at avec et sans fuseau comparés sur la même échelle (comme 06)
+    collected = pd.to_datetime(df["collected_at"], format="ISO8601", errors="coerce", utc=True) if "collected_at" in df.columns else None
+    if collected is not None:
+        order = collected.sort_values(kind="stable", na_position="first").index
+        df = df.loc[order]
+    df = df.drop_duplicates(subset=macro_store.KEY_COLS, keep="last")
+    if tombstones:
+        df = df.reindex(columns=list(df.columns) + ([OP_COL] if OP_COL not in df.columns else []))
+    elif OP_COL in df.columns:
+        df = df[df[OP_COL].astype(str) != OP_DELETE].drop(columns=[OP_COL])
+    return df.sort_index(kind="stable").reset_index(drop=True)
+
+
+def read(path: Path = macro_store.OUT_CSV, log_dir: Path = LOG_DIR, tombstones: bool = False) -> pd.DataFrame:
+    """Vue courante: snapshot + segments non fusionnés."""
+    while True:
+        # segments listés AVANT le snapshot: une compaction écrit le snapshot puis supprime ses
+        # segments, donc un segment absent de la liste est forcément déjà dans le snapshot lu
+        # (relire un segment déjà fusionné est sans effet: même version par clé)
+        listed = segments(log_dir)
+        try:
+            snapshot = macro_store.load_df(path)
+            return merge([snapshot] + [_read_segment(p) for p in listed], tombstones=tombstones)
+        except FileNotFoundError:
+            continue  # segment fusionné par une compaction pendant la lecture: relire le nouveau snapshot
+
+
+@contextmanager
+def _compaction_lock(log_dir: Path, wait: bool):
+    log_dir.mkdir(parents=True, exist_ok=True)
+    with open(log_dir / ".compact.lock", "w") as fh:
+        if fcntl is not None:
+            try:
+                fcntl.flock(fh, fcntl.LOCK_EX | (0 if wait else fcntl.LOCK_NB))
+            except BlockingIOError:
+                yield False
+                return
+        yield True
+
+
+def compact(path: Path = macro_store.OUT_CSV, log_dir: Path = LOG_DIR, wait: bool = True) -> dict | None:
+    """Snapshot + segments -> nouveau snapshot. None si une autre compaction tourne (wait=False)."""
+    with _compaction_lock(log_dir, wait) as locked:
+        if not locked:
+            return None
+        # segments écrits pendant la compaction: non listés ici, donc conservés pour la suivante
+        merged = segments(log_dir)
+        snapshot = macro_store.load_df(path)
+        df = merge([snapshot] + [_read_segment(p) for p in merged])
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".tmp")
+        df.to_csv(tmp, index=False)
+        tmp.replace(path)
+        for p in merged:
+            p.unlink(missing_ok=True)
+    return {"segments": len(merged), "before": len(snapshot), "rows": len(df)}
+
+
+class LogStore(macro_store.MacroStore):
+    """MacroStore dont save() ajoute un segment au lieu de réécrire le CSV."""
+
+    def __init__(self, path: Path = macro_store.OUT_CSV, log_dir: Path = LOG_DIR):
+        self.path = Path(path)
+        self.log_dir = Path(log_dir)
+        df = read(self.path, self.log_dir, tombstones=True)
+        deleted = df[OP_COL].astype(str) == OP_DELETE
+        # suppressions déjà écrites: une ligne plus ancienne reste masquée pour les lecteurs
+        self.deleted_at = {
+            macro_store._key(row): row.get("collected_at") for row in df[deleted].to_dict("records")
+        }
+        self._reset(df[~deleted].drop(columns=[OP_COL]))
+        self.pending = []  # lignes et tombstones à écrire dans le prochain segment (ordre des opérations)
+
+    def _keys(self) -> set:
+        df = self.frame()
+        return set(zip(*(df[c].astype(str) for c in macro_store.KEY_COLS)))
+
+    def upsert(self, rows) -> dict:
+        """Comme MacroStore.upsert, mais keep-last par collected_at comme merge(): une ligne plus
+        ancienne que la version courante (ou que sa suppression écrite) est ignorée -> "stale"."""
+        rows = rows.to_dict("records") if isinstance(rows, pd.DataFrame) else list(rows)
+        counts = {"inserted": 0, "updated": 0, "stale": 0}
+        for row in rows:
+            key = macro_store._key(row)
+            current = self.get(key)
+            reference = current.get("collected_at") if current is not None else self.deleted_at.get(key)
+            if (current is not None or key in self.deleted_at) and older(row.get("collected_at"), reference):
+                counts["stale"] += 1
+                continue
+            for name, n in super().upsert([row]).items():
+                counts[name] += n
+            self.pending.append(row)
+            self.deleted_at.pop(key, None)
+        return counts
+
+    def delete_where(self, **equals) -> int:
+        before = {macro_store._key(row): row.get("collected_at") for row in self.frame().to_dict("records")}
+        removed = super().delete_where(**equals)
+        if removed:
+            after = self._keys()
+            deleted = [key for key in before if key not in after]
+            self.pending = [row for row in self.pending if macro_store._key(row) not in set(deleted)]
+            now = datetime.now().isoformat(timespec="seconds")
+            for key in deleted:
+                # tombstone jamais plus ancien que la ligne supprimée (sinon merge la ferait revivre)
+                ts = before[key] if older(now, before[key]) else now
+                self.pending.append({**dict(zip(macro_store.KEY_COLS, key)), "collected_at": ts, OP_COL: OP_DELETE})
+                self.deleted_at[key] = ts
+        return removed
+
+    def save(self):
+        if not self.pending:
+            return
+        rows = list(self.pending)
+
+        self.log_dir.mkdir(parents=True, exist_ok=True)
+        name = f"segment-{datetime.now().strftime('%Y%m%dT%H%M%S%f')}-{os.getpid()}-{threading.get_ident()}.csv"
+        tmp = self.log_dir / f".{name}.tmp"
+        df = pd.DataFrame(rows)
+        df.to_csv(tmp, index=False)
+        tmp.replace(self.log_dir / name)
+
+        self._reset(self.frame())
+        self.pending = []
+
+        if COMPACT_SEGMENTS and len(segments(self.log_dir)) >= COMPACT_SEGMENTS:
+            spawn_compaction(self.path, self.log_dir)
+
+
+def spawn_compaction(path: Path = macro_store.OUT_CSV, log_dir: Path = LOG_DIR) -> subprocess.Popen:
+    """compact(wait=False) dans un processus détaché: survit à la fin du script écrivain."""
+    return subprocess.Popen(
+        [sys.executable, str(Path(__file__).resolve()), "compact", "--no-wait", str(path), str(log_dir)],
+        stdout=subprocess.DEVNULL,
+        start_new_session=True,
+    )
+
+
+def main():
+    command = sys.argv[1] if len(sys.argv) > 1 else ""
+    if command == "compact":
+        args = [a for a in sys.argv[2:] if a != "--no-wait"]
+        path, log_dir = (Path(args[0]), Path(args[1])) if len(args) == 2 else (macro_store.OUT_CSV, LOG_DIR)
+        stats = compact(path, log_dir, wait="--no-wait" not in sys.argv[2:])
+        if stats is None:
+            print("Compaction déjà en cours: rien à faire")
+            return 0
+        print(f"OK -> compaction: {stats['segments']} segment(s) fusionné(s) | snapshot {stats['before']} -> {stats['rows']} ligne(s)")
+    elif command == "status":
+        segs = segments()
+        n_rows = sum(len(_read_segment(p)) for p in segs)
+        print(f"{len(segs)} segment(s) non fusionné(s), {n_rows} ligne(s) en attente dans {LOG_DIR}")
+    else:
+        print("Usage: python src/macro_log.py compact [--no-wait] [snapshot.csv log_dir] | status")
+        return 2
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
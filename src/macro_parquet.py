@@ -0,0 +1,182 @@
+"""
+Store colonnaire du dataset macro: Parquet partitionné + fichier Arrow IPC (lecture analytique).
+
+Les dashboards / notebooks relisaient tout macro_uemoa.csv et réinféraient les types à chaque
+chargement. Ici le dataset est exporté depuis le store (macro_store.open_store(): CSV ou SQLite):
+
+- data/processed/macro_uemoa_parquet/country=.../indicator=.../*.parquet (partitions hive)
+- colonnes typées: value float64, period date32 (date_reference parsée), collected_at timestamp;
+  chaînes répétées (unit, source_name, source_url) encodées en dictionnaire
+- read(country=, indicator=, since=, columns=): filtre poussé dans la lecture
+  (partitions non concernées jamais ouvertes, row groups filtrés sur period): temps et mémoire
+  proportionnels à la tranche demandée, pas à tout l'historique
+- data/processed/macro_uemoa.arrow (IPC non compressé): read_arrow() le mappe en mémoire,
+  sans copie
+
+pyarrow est optionnel (pip install pyarrow): seul ce module en dépend.
+
+Usage:
+    python src/macro_parquet.py   # (ré)écrit Parquet + Arrow depuis le store, puis exemple de lecture
+"""
+import shutil
+import time
+from datetime import date
+from pathlib import Path
+
+import pandas as pd
+
+import macro_store
+
+try:
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+except ImportError:
+    pa = ds = None
+
+PARQUET_DIR = Path("data/processed/macro_uemoa_parquet")
+ARROW_FILE = Path("data/processed/macro_uemoa.arrow")
+
+PARTITION_COLS = ["country", "indicator"]
+
+
+def _require():
+    if pa is None:
+        raise RuntimeError("pyarrow requis pour le store Parquet/Arrow (pip install pyarrow)")
+
+
+def schema():
+    _require()
+    dict_str = pa.dictionary(pa.int32(), pa.string())
+    return pa.schema([
+        ("country", dict_str),
+        ("indicator", dict_str),
+        ("value", pa.float64()),
+        ("unit", dict_str),
+        ("date_reference", pa.string()),
+        ("period", pa.date32()),
+        ("source_name", dict_str),
+        ("source_url", dict_str),
+        ("collected_at", pa.timestamp("s")),
+        ("comment", pa.string()),
+    ])
+
+
+def to_table(df: pd.DataFrame):
+    """DataFrame du store -> table Arrow typée, triée par (country, indicator, period)."""
+    _require()
+    df = df.reindex(columns=macro_store.COLUMNS)
+    out = pd.DataFrame({
+        "country": df["country"].astype(str),
+        "indicator": df["indicator"].astype(str),
+        "value": pd.to_numeric(df["value"], errors="coerce"),
+        "unit": df["unit"].astype("string"),
+        "date_reference": df["date_reference"].astype(str),
+        "period": macro_store.reference_dates(df["date_reference"]).dt.date,
+        "source_name": df["source_name"].astype("string"),
+        "source_url": df["source_url"].astype("string"),
+        # comme 06 / macro_log / macro_frame: avec et sans fuseau mélangés -> UTC naïf (pas de NaT)
+        "collected_at": pd.to_datetime(df["collected_at"], format="ISO8601", errors="coerce", utc=True)
+        .dt.tz_localize(None).dt.floor("s"),
+        "comment": df["comment"].astype("string"),
+    })
+    out = out.sort_values(["country", "indicator", "period"], kind="stable", na_position="last")
+    return pa.Table.from_pandas(out, schema=schema(), preserve_index=False)
+
+
+def write(df: pd.DataFrame | None = None) -> int:
+    """Réécrit le dataset Parquet + le fichier Arrow depuis df (défaut: tout le store)."""
+    _require()
+    if df is None:
+        df = macro_store.open_store().frame()
+    table = to_table(df)
+
+    # Parquet: écrit à côté puis remplace (lecteurs jamais face à un dataset à moitié écrit)
+    tmp_dir = PARQUET_DIR.with_name(PARQUET_DIR.name + ".tmp")
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    ds.write_dataset(
+        table,
+        tmp_dir,
+        format="parquet",
+        partitioning=PARTITION_COLS,
+        partitioning_flavor="hive",
+        basename_template="part-{i}.parquet",
+    )
+    old_dir = PARQUET_DIR.with_name(PARQUET_DIR.name + ".old")
+    shutil.rmtree(old_dir, ignore_errors=True)
+    if PARQUET_DIR.exists():
+        PARQUET_DIR.rename(old_dir)
+    tmp_dir.rename(PARQUET_DIR)
+    shutil.rmtree(old_dir, ignore_errors=True)
+
+    # Arrow IPC non compressé: mappable en mémoire
+    ARROW_FILE.parent.mkdir(parents=True, exist_ok=True)
+    tmp = ARROW_FILE.with_suffix(".tmp")
+    with pa.OSFile(str(tmp), "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table)
+    tmp.replace(ARROW_FILE)
+    return table.num_rows
+
+
+def _filter(country: str | None, indicator: str | None, since):
+    expr = None
+    for col, value in (("country", country), ("indicator", indicator)):
+        if value is not None:
+            e = ds.field(col) == value
+            expr = e if expr is None else expr & e
+    if since is not None:
+        if not isinstance(since, date):
+            start = macro_store.reference_dates(pd.Series([str(since)])).iloc[0]
+            if pd.isna(start):
+                # NaT => filtre toujours vrai côté pyarrow: tout le dataset au lieu d'une erreur
+                raise ValueError(f"since non reconnu: {since!r} (attendu \"2020\", \"2020-01\", \"2020-01-15\" ou date)")
+            since = start.date()
+        e = ds.field("period") >= pa.scalar(since, pa.date32())
+        expr = e if expr is None else expr & e
+    return expr
+
+
+def read(country: str | None = None, indicator: str | None = None, since=None, columns: list[str] | None = None) -> pd.DataFrame:
+    """Tranche du dataset Parquet; since = "2020", "2020-01" ou date (lignes sans period exclues).
+    ValueError si since n'est pas reconnu ("2020-novembre")."""
+    _require()
+    dataset = ds.dataset(PARQUET_DIR, format="parquet", partitioning=ds.HivePartitioning.discover(infer_dictionary=True))
+    table = dataset.to_table(columns=columns, filter=_filter(country, indicator, since))
+    return table.to_pandas(date_as_object=False)
+
+
+def read_arrow(country: str | None = None, indicator: str | None = None, since=None, columns: list[str] | None = None) -> pd.DataFrame:
+    """Même lecture depuis le fichier Arrow IPC mappé en mémoire (pas de copie avant le filtre)."""
+    _require()
+    with pa.memory_map(str(ARROW_FILE), "r") as source:
+        table = pa.ipc.open_file(source).read_all()
+    expr = _filter(country, indicator, since)
+    if expr is not None:
+        table = ds.dataset(table).to_table(filter=expr)
+    if columns is not None:
+        table = table.select(columns)
+    return table.to_pandas(date_as_object=False)
+
+
+def main():
+    n = write()
+    parts = len(list(PARQUET_DIR.glob("*/*/*.parquet")))
+    print(f"OK -> {n} ligne(s) | {parts} fichier(s) Parquet dans {PARQUET_DIR} | Arrow: {ARROW_FILE} ({ARROW_FILE.stat().st_size} octets)")
+
+    # Exemple: Côte d’Ivoire, inflation, depuis 2020
+    country, since = "Côte d’Ivoire", "2020"
+    start = time.perf_counter()
+    df = read(country=country, since=since)
+    parquet_ms = (time.perf_counter() - start) * 1000
+    df = df[df["indicator"].astype(str).str.contains("Inflation", case=False)]
+
+    start = time.perf_counter()
+    full = pd.read_csv(macro_store.OUT_CSV) if macro_store.OUT_CSV.exists() else None
+    csv_ms = (time.perf_counter() - start) * 1000
+
+    print(f"\n{country} / inflation depuis {since}: {len(df)} ligne(s) | Parquet filtré: {parquet_ms:.1f} ms"
+          + (f" | CSV complet ({len(full)} lignes): {csv_ms:.1f} ms" if full is not None else ""))
+    print(df[["indicator", "date_reference", "value", "unit"]].tail(12).to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,224 @@
+"""
+Stockage du dataset macro (data/processed/macro_uemoa.csv): un seul moteur d'upsert.
+
+Remplace les copies de upsert / upsert_macro / upsert_batch des scripts (04, 05, 05b, 08,
+10, 10c, 11, 12, 18, 19b), qui relisaient tout le CSV et reconstruisaient des clés texte
+ligne par ligne à chaque écriture.
+
+- index de hachage {(country, indicator, date_reference): ligne}, construit une fois au chargement;
+  clé en double dans le fichier (ancien CSV non dédoublonné): seule la dernière copie est gardée,
+  les autres disparaissent à la prochaine écriture (comme les anciens upserts)
+- upsert(lignes): un lot entier, coût O(lot) (recherche dans l'index, pas de jointure sur la table)
+- une ligne existante est remplacée entièrement (même sémantique que les anciens upserts)
+- schéma souple: colonnes nouvelles ajoutées, colonnes absentes laissées vides
+- save(): si le lot ne contient que des clés nouvelles sans nouvelle colonne, simple ajout
+  en fin de fichier (O(lot)); sinon réécriture du fichier, une seule fois par run
+- unchanged(lignes): toutes déjà présentes à l'identique (hors collected_at) -> rien à écrire;
+  value comparée en nombre (112 == 112.0 relu du CSV), les autres colonnes en texte
+
+Backend: UEMOA_MACRO_BACKEND=csv (défaut), sqlite (cf. macro_db.py) ou log (journal append-only,
+cf. macro_log.py); open_store() choisit.
+
+Usage:
+    store = macro_store.open_store()
+    if not store.unchanged(rows):
+        store.upsert(rows)
+        store.save()
+"""
+import math
+import os
+from pathlib import Path
+
+import pandas as pd
+
+MACRO_BACKEND = os.environ.get("UEMOA_MACRO_BACKEND", "csv").lower()
+
+OUT_CSV = Path("data/processed/macro_uemoa.csv")
+
+KEY_COLS = ["country", "indicator", "date_reference"]
+COLUMNS = ["country", "indicator", "value", "unit", "date_reference", "source_name", "source_url", "collected_at", "comment"]
+
+# Colonnes comparées pour décider qu'une ligne est déjà dans le store (collected_at exclu)
+COMPARE_COLS = ["country", "indicator", "date_reference", "value", "unit", "source_url", "comment"]
+
+
+def _key(row: dict) -> tuple[str, str, str]:
+    return tuple(str(row.get(c)) for c in KEY_COLS)
+
+
+def _same(a, b) -> bool:
+    return str(a) == str(b) or (pd.isna(a) and pd.isna(b))
+
+
+def _same_value(a, b) -> bool:
+    """value: 112 == 112.0 == "112" (float relu du CSV); texte non numérique comparé comme tel."""
+    x, y = pd.to_numeric(pd.Series([a, b], dtype=object), errors="coerce")
+    if pd.isna(x) or pd.isna(y):
+        return _same(a, b)
+    return math.isclose(x, y, rel_tol=1e-9, abs_tol=1e-12)
+
+
+def same_row(row: dict, current: dict) -> bool:
+    """row déjà présente à l'identique dans current (colonnes COMPARE_COLS fournies par row)."""
+    return all(
+        (_same_value if c == "value" else _same)(row.get(c), current.get(c))
+        for c in COMPARE_COLS if c in row
+    )
+
+
+def reference_dates(date_reference: pd.Series) -> pd.Series:
+    """date_reference texte -> date (début de période): "2024" -> 2024-01-01, "2025-06" -> 2025-06-01.
+    Formats non reconnus ("2025-novembre") -> NaT."""
+    s = date_reference.astype(str).str.strip()
+    out = pd.to_datetime(s.where(s.str.fullmatch(r"\d{4}-\d{2}-\d{2}")), format="%Y-%m-%d", errors="coerce")
+    out = out.fillna(pd.to_datetime(s.where(s.str.fullmatch(r"\d{4}-\d{2}")), format="%Y-%m", errors="coerce"))
+    return out.fillna(pd.to_datetime(s.where(s.str.fullmatch(r"\d{4}")), format="%Y", errors="coerce"))
+
+
+def load_df(path: Path = OUT_CSV) -> pd.DataFrame:
+    # clés lues en texte: "2024" reste "2024" (et non l'entier 2024)
+    if path.exists():
+        return pd.read_csv(path, dtype={c: str for c in KEY_COLS})
+    return pd.DataFrame(columns=COLUMNS)
+
+
+class MacroStore:
+    def __init__(self, path: Path = OUT_CSV):
+        self.path = Path(path)
+        self._reset(load_df(self.path))
+        self._on_disk = self.path.exists()
+
+    def _reset(self, df: pd.DataFrame):
+        keys = df[KEY_COLS].astype(str)
+        duplicated = keys.duplicated(keep="last")
+        # clé en double: dernière copie gardée (sinon un upsert ne remplacerait qu'une des copies)
+        self.df = df[~duplicated.to_numpy()].reset_index(drop=True)
+        self.index = {k: i for i, k in enumerate(zip(*(self.df[c].astype(str) for c in KEY_COLS)))}
+        self.updates = {}    # position dans df -> ligne de remplacement
+        self.new_rows = []   # lignes de clés nouvelles
+        self.new_index = {}  # clé -> position dans new_rows
+        self.appended = 0    # new_rows[:appended] déjà ajoutées au fichier
+        self.rewrite = bool(duplicated.any())  # copies en trop encore dans le fichier
+
+    def __len__(self):
+        return len(self.df) + len(self.new_rows)
+
+    def get(self, key: tuple) -> dict | None:
+        key = tuple(str(k) for k in key)
+        if key in self.new_index:
+            return self.new_rows[self.new_index[key]]
+        pos = self.index.get(key)
+        if pos is None:
+            return None
+        return self.updates.get(pos) or self.df.iloc[pos].to_dict()
+
+    def unchanged(self, rows) -> bool:
+        """True si toutes les lignes sont déjà présentes à l'identique (hors collected_at)."""
+        rows = rows.to_dict("records") if isinstance(rows, pd.DataFrame) else list(rows)
+        if not rows:
+            return False
+        for row in rows:
+            current = self.get(_key(row))
+            if current is None:
+                return False
+            if not same_row(row, current):
+                return False
+        return True
+
+    def upsert(self, rows) -> dict:
+        """Applique un lot (liste de dicts ou DataFrame). Retourne {"inserted", "updated"}."""
+        rows = rows.to_dict("records") if isinstance(rows, pd.DataFrame) else list(rows)
+        inserted = updated = 0
+        for row in rows:
+            key = _key(row)
+            if key in self.new_index:
+                pos = self.new_index[key]
+                self.new_rows[pos] = row
+                self.rewrite |= pos < self.appended  # ligne déjà écrite en fin de fichier
+                updated += 1
+            elif key in self.index:
+                self.updates[self.index[key]] = row
+                updated += 1
+            else:
+                self.new_index[key] = len(self.new_rows)
+                self.new_rows.append(row)
+                inserted += 1
+        return {"inserted": inserted, "updated": updated}
+
+    def delete_where(self, **equals) -> int:
+        """Supprime les lignes dont les colonnes valent exactement `equals` (purge: coût O(table))."""
+        df = self.frame()
+        mask = pd.Series(True, index=df.index)
+        for col, value in equals.items():
+            mask &= df[col].astype(str) == str(value) if col in df.columns else False
+        removed = int(mask.sum())
+        if removed:
+            self._reset(df[~mask])
+            self.rewrite = True
+        return removed
+
+    def select(self, country: str | None = None, indicator: str | None = None, since: str | None = None) -> pd.DataFrame:
+        """Lignes filtrées, since = date_reference minimale ("2020", "2020-01")."""
+        df = self.frame()
+        mask = pd.Series(True, index=df.index)
+        for col, value in (("country", country), ("indicator", indicator)):
+            if value is not None:
+                mask &= df[col].astype(str) == value
+        if since is not None:
+            mask &= df["date_reference"].astype(str) >= str(since)
+        return df[mask].sort_values(KEY_COLS).reset_index(drop=True)
+
+    def frame(self) -> pd.DataFrame:
+        """Table complète: lignes inchangées, puis lignes remplacées et nouvelles (comme les anciens upserts)."""
+        if not self.updates and not self.new_rows:
+            return self.df
+        changed = list(self.updates.values()) + self.new_rows
+        kept = self.df.drop(index=list(self.updates)) if self.updates else self.df
+        return pd.concat([kept, pd.DataFrame(changed)], ignore_index=True)
+
+    def save(self):
+        pending = self.new_rows[self.appended:]
+        if not self.updates and not pending and not self.rewrite:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        new_cols = {c for row in pending for c in row} - set(self.df.columns)
+        if self._on_disk and not self.rewrite and not self.updates and not new_cols:
+            # que des clés nouvelles, même schéma: ajout en fin de fichier, O(lot)
+            pd.DataFrame(pending, columns=list(self.df.columns)).to_csv(self.path, mode="a", header=False, index=False)
+            self.appended = len(self.new_rows)
+            return
+
+        df = self.frame()
+        tmp = self.path.with_suffix(".tmp")
+        df.to_csv(tmp, index=False)
+        tmp.replace(self.path)
+        self._on_disk = True
+        self._reset(df)
+
+    def close(self):
+        self.save()
+
+
+def open_store(backend: str | None = None):
+    """MacroStore (CSV), macro_db.SqliteStore ou macro_log.LogStore selon UEMOA_MACRO_BACKEND."""
+    backend = (backend or MACRO_BACKEND).lower()
+    if backend == "sqlite":
+        import macro_db
+        return macro_db.SqliteStore()
+    if backend == "log":
+        import macro_log
+        return macro_log.LogStore()
+    if backend != "csv":
+        raise ValueError(f"UEMOA_MACRO_BACKEND inconnu: {backend!r} (csv | sqlite | log)")
+    return MacroStore()
+
+
+def upsert_rows(rows) -> dict:
+    """Charge, applique le lot, sauve. Retourne {"inserted", "updated", "unchanged"}."""
+    store = open_store()
+    if store.unchanged(rows):
+        return {"inserted": 0, "updated": 0, "unchanged": True}
+    counts = store.upsert(rows)
+    store.save()
+    return {**counts, "unchanged": False}
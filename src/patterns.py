@@ -0,0 +1,281 @@
+"""
+Registre des patterns d'extraction + budget de temps par pattern.
+
+Tous les patterns d'extraction (08, 10, 10b_*, 11, 12, et ceux de cpm_rates pour 04/05/05b)
+sont déclarés ici via register(nom, regex). Chaque pattern enregistré:
+- a un nom ("12.ihpc_global") et un budget en ms (PATTERN_BUDGET_MS par défaut) par tranche
+  de PATTERN_BUDGET_CHARS caractères: un bulletin long a droit à plus de temps qu'une phrase
+  (coût linéaire normal), un backtracking catastrophique dépasse quand même
+- s'utilise comme un re.Pattern (search, finditer, pattern)
+- à l'exécution, chaque appel est borné par son budget (SIGALRM: le moteur re vérifie les
+  signaux pendant le backtracking). Budget dépassé -> "NEEDS AUDIT" affiché et aucun match
+  (None / itérateur vide): le run continue au lieu de rester bloqué des minutes.
+  Le "rien trouvé" qui en résulte n'est pas un vrai négatif: timeouts() compte les
+  interruptions (par thread) pour que extract_cache ne mette pas ce résultat en cache.
+  Hors thread principal (ou sans SIGALRM), l'appel est seulement chronométré et signalé.
+
+Benchmark: python src/patterns.py
+chaque pattern est chronométré sur les documents stockés (raw_store: HTML + PDF via les caches
+de texte) et sur des entrées synthétiques pire cas (texte sans point, ancres répétées...);
+au-delà du budget (même règle de longueur qu'à l'exécution) -> OVER BUDGET.
+"""
+import os
+import re
+import signal
+import threading
+import time
+from contextlib import contextmanager
+
+PATTERN_BUDGET_MS = float(os.environ.get("UEMOA_PATTERN_BUDGET_MS", "500"))
+PATTERN_BUDGET_CHARS = int(os.environ.get("UEMOA_PATTERN_BUDGET_CHARS", "100000"))
+
+REGISTRY: dict[str, "GuardedPattern"] = {}
+
+_local = threading.local()
+
+NUMBER_PCT = r"([+\-]?\s*[0-9]+(?:[.,][0-9]+)?)\s*%"
+
+
+class PatternTimeout(Exception):
+    pass
+
+
+def timeouts() -> int:
+    """Nombre de patterns interrompus dans ce thread depuis son démarrage."""
+    return getattr(_local, "timeouts", 0)
+
+
+def _on_alarm(signum, frame):
+    raise PatternTimeout()
+
+
+@contextmanager
+def time_budget(budget_ms: float):
+    """Lève PatternTimeout au-delà de budget_ms (thread principal POSIX seulement)."""
+    armed = hasattr(signal, "setitimer") and threading.current_thread() is threading.main_thread()
+    if armed:
+        previous = signal.signal(signal.SIGALRM, _on_alarm)
+        signal.setitimer(signal.ITIMER_REAL, budget_ms / 1000)
+    try:
+        yield
+    finally:
+        if armed:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+            signal.signal(signal.SIGALRM, previous)
+
+
+class GuardedPattern:
+    def __init__(self, name: str, regex: re.Pattern, budget_ms: float):
+        self.name = name
+        self.regex = regex
+        self.pattern = regex.pattern
+        self.budget_ms = budget_ms
+
+    def budget_for(self, text: str) -> float:
+        """Budget (ms) pour ce texte: budget_ms par tranche de PATTERN_BUDGET_CHARS caractères."""
+        return self.budget_ms * max(1.0, len(text) / PATTERN_BUDGET_CHARS)
+
+    def _run(self, func, text: str, empty):
+        budget_ms = self.budget_for(text)
+        start = time.perf_counter()
+        try:
+            with time_budget(budget_ms):
+                return func()
+        except PatternTimeout:
+            _local.timeouts = timeouts() + 1
+            print(f"NEEDS AUDIT -> pattern {self.name} interrompu (budget {budget_ms:g} ms dépassé, {len(text)} caractères)")
+            return empty
+        finally:
+            elapsed = (time.perf_counter() - start) * 1000
+            if elapsed > budget_ms * 1.5:  # non interrompu (thread secondaire / Windows)
+                print(f"SLOW PATTERN -> {self.name}: {elapsed:.0f} ms (budget {budget_ms:g} ms)")
+
+    def search(self, text: str, *args):
+        return self._run(lambda: self.regex.search(text, *args), text, None)
+
+    def finditer(self, text: str, *args):
+        return iter(self._run(lambda: list(self.regex.finditer(text, *args)), text, []))
+
+    def __repr__(self):
+        return f"GuardedPattern({self.name!r})"
+
+
+def register(name: str, pattern: str, flags: int = re.IGNORECASE, budget_ms: float | None = None) -> GuardedPattern:
+    guarded = GuardedPattern(name, re.compile(pattern, flags), PATTERN_BUDGET_MS if budget_ms is None else budget_ms)
+    REGISTRY[name] = guarded
+    return guarded
+
+
+IHPC_SUBJECT = r"(?:Indice\s+Harmonisé\s+des\s+Prix\s+à\s+la\s+Consommation\s*\(IHPC\)|IHPC)"
+
+
+def pct_within(*gaps: int) -> str:
+    """
+    Lookahead "un % dans la portée du match" à placer après le sujet d'un pattern à intervalles
+    paresseux empilés: sans %, échec en O(portée) au lieu d'essayer toutes les combinaisons
+    d'intervalles (coût cubique sur "IHPC enregistre une hausse de 1,2 " répété, sans %).
+    Portée = somme des intervalles + 100 (mots-clés et nombre): condition nécessaire du match,
+    les matches ne changent pas.
+    """
+    return rf"(?=[^%]{{0,{sum(gaps) + 100}}}%)"
+
+
+# --- 08: pages HTML ANSD / ANStat ---
+SEN_ANNUAL_INFLATION = register(
+    "08.sen_annual_inflation",
+    r"taux d[’']inflation\s+s[’']est\s+établi\s+à\s*([+\-]?\s*[0-9]+(?:[.,][0-9]+)?)\s*%\s+en\s+(20[0-9]{2})",
+)
+CIV_HOME_YOY = register(
+    "08.civ_home_yoy",
+    r"IHPC[^.]{0,120}hausse\s+de\s*([+\-]?\s*[0-9]+(?:[.,][0-9]+)?)\s*%\s+en\s+([A-Za-zéûôîàç]+)\s+(20[0-9]{2})\s+par\s+rapport\s+à\s+\2\s+(20[0-9]{2})",
+)
+
+# --- 10: YoY dans les premières pages des PDFs ---
+PDF_YOY = [
+    register("10.glissement_annuel", r"glissement\s+annuel[^0-9+\-]{0,80}" + NUMBER_PCT),
+    register("10.variation_annuelle", r"variation\s+annuelle[^0-9+\-]{0,80}" + NUMBER_PCT),
+    register("10.meme_mois", r"par\s+rapport\s+au\s+m[êe]me\s+mois[^0-9+\-]{0,120}" + NUMBER_PCT),
+]
+
+# --- 10b_audit: phrases d'audit ---
+AUDIT_SEN_INFLATION = register(
+    "10b_audit.sen_inflation",
+    r"(taux\s+d[’']inflation[^.]{0,200}?s[’']établit\s+à\s*[+\-]?\s*[0-9]+(?:[.,][0-9]+)?\s*%)",
+)
+AUDIT_CIV_IHPC_GLISSEMENT = register(
+    "10b_audit.civ_ihpc_glissement",
+    r"(IHPC[^.]{0,400}?glissement\s+annuel[^.]{0,300}?[+\-]?\s*[0-9]+(?:[.,][0-9]+)?\s*%)",
+)
+AUDIT_CIV_GLISSEMENT = register(
+    "10b_audit.civ_glissement",
+    r"(glissement\s+annuel[^.]{0,220}?[+\-]?\s*[0-9]+(?:[.,][0-9]+)?\s*%)",
+)
+
+# --- 10b_v14: IHPC global CI (test) ---
+V14_IHPC_VERB = register(
+    "10b_v14.ihpc_verb",
+    r"(" + IHPC_SUBJECT + pct_within(300, 200, 200) + r"[^.]{0,300}?"
+    r"(?:enregistre|affiche|présente|observe|marque|connait|connaît)[^.]{0,200}?"
+    r"(?:une\s+)?(baisse|hausse)[^.]{0,200}?"
+    r"([+\-]?\s*[0-9]+(?:[.,][0-9]+)?)\s*%)",
+)
+V14_IHPC_GLISSEMENT = register(
+    "10b_v14.ihpc_glissement",
+    r"(" + IHPC_SUBJECT + r"[^.]{0,400}?"
+    r"glissement\s+annuel[^.]{0,200}?"
+    r"(?:une\s+)?(baisse|hausse)[^.]{0,200}?"
+    r"([+\-]?\s*[0-9]+(?:[.,][0-9]+)?)\s*%)",
+)
+V14_EXCLUDE = register("10b_v14.exclude", r"\b(énergie|energie|poste\s+énergie|divisions?|sous[-\s]?indice|transport|aliments?)\b")
+
+# --- 11: IHPC global CI ---
+CI_IHPC_GLOBAL = register(
+    "11.ihpc_global",
+    r"(" + IHPC_SUBJECT + pct_within(400, 250, 250) + r"[^.]{0,400}?"
+    r"(?:enregistre|affiche|présente|observe|marque|connait|connaît)[^.]{0,250}?"
+    r"(?:une\s+)?(baisse|hausse)[^.]{0,250}?"
+    r"\(?\s*([+\-]?\s*[0-9]+(?:[.,][0-9]+)?)\s*%\s*\)?)",
+)
+CI_EXCLUDE = register("11.exclude", r"\b(énergie|energie|poste\s+énergie|sous[-\s]?indice|division)\b")
+
+# --- 12: IHPC global, tous pays ---
+IHPC_GLOBAL = register(
+    "12.ihpc_global",
+    r"(" + IHPC_SUBJECT + pct_within(500, 300, 300) + r"[^.]{0,500}?"
+    r"(?:enregistre|affiche|présente|observe|marque|connait|connaît|évolue|progresse|recule)[^.]{0,300}?"
+    r"(?:une\s+)?(baisse|hausse)[^.]{0,300}?"
+    r"\(?\s*([+\-]?\s*[0-9]+(?:[.,][0-9]+)?)\s*%\s*\)?)",
+)
+IHPC_EXCLUDE = register("12.exclude", r"\b(énergie|energie|poste\s+énergie|sous[-\s]?indice|division|transports?|aliments?)\b")
+
+
+def worst_case_inputs(size: int = 200_000) -> dict[str, str]:
+    """Entrées synthétiques qui font le plus backtracker les intervalles paresseux."""
+    words = "l'IHPC enregistre affiche observe une variation des prix du glissement annuel taux d'inflation "
+
+    def fill(unit: str) -> str:
+        return (unit * (size // len(unit) + 1))[:size]
+
+    return {
+        "sans_point": fill(words),
+        "ancres_repetees": fill("IHPC "),
+        "ancres_sans_pourcent": fill("IHPC enregistre une hausse de 1,2 "),
+        "chiffres": fill("0,1 2,3 45,67 "),
+        "taux_sans_valeur": fill("taux directeur guichet de prêt marginal réserves obligatoires "),
+        "espaces": fill("IHPC" + " " * 200),
+    }
+
+
+def corpus() -> dict[str, str]:
+    """Texte des documents stockés (raw_store), via les caches de texte HTML / PDF."""
+    import documents
+    import pdf_text
+    import raw_store
+
+    texts = {}
+    for entry in raw_store.entries("*"):
+        path = entry["path"]
+        if path.suffix == ".html":
+            texts[entry["key"]] = documents.html_text(path)
+        elif path.suffix == ".pdf":
+            texts[entry["key"]] = " ".join(pdf_text.page_texts(path))
+    return texts
+
+
+def benchmark(inputs: dict[str, str], repeat: int = 3) -> list[dict]:
+    """
+    Pire temps (ms) de chaque pattern, rapporté au budget de chaque entrée (budget_for: même
+    règle qu'à l'exécution); appels bornés à 10x le budget, pas de répétition hors budget.
+    """
+    rows = []
+    for name, guarded in sorted(REGISTRY.items()):
+        worst_ms, worst_budget, worst_input, interrupted = 0.0, guarded.budget_ms, None, False
+        for label, text in inputs.items():
+            budget_ms = guarded.budget_for(text)
+            for _ in range(repeat):
+                start = time.perf_counter()
+                try:
+                    with time_budget(budget_ms * 10):
+                        list(guarded.regex.finditer(text))
+                except PatternTimeout:
+                    interrupted = True
+                elapsed = (time.perf_counter() - start) * 1000
+                if elapsed / budget_ms > worst_ms / worst_budget:
+                    worst_ms, worst_budget, worst_input = elapsed, budget_ms, label
+                if elapsed > budget_ms:
+                    break
+        rows.append({
+            "pattern": name,
+            "worst_ms": worst_ms,
+            "input": worst_input,
+            "budget_ms": worst_budget,
+            "over_budget": worst_ms > worst_budget,
+            "interrupted": interrupted,
+        })
+    return rows
+
+
+def main():
+    # Lancé en script, ce fichier est __main__: on passe par le module importé `patterns`,
+    # celui dans lequel cpm_rates enregistre aussi ses patterns
+    import cpm_rates  # noqa: F401
+    import patterns as registry
+
+    inputs = {f"synth:{k}": v for k, v in registry.worst_case_inputs().items()}
+    inputs.update({f"doc:{k}": v for k, v in registry.corpus().items()})
+
+    print(f"\n=== BENCHMARK PATTERNS : {len(registry.REGISTRY)} patterns x {len(inputs)} entrées ===\n")
+    rows = registry.benchmark(inputs)
+    for r in rows:
+        flag = "OVER BUDGET" if r["over_budget"] else "ok"
+        if r["interrupted"]:
+            flag += " (interrompu à 10x le budget)"
+        print(f"{r['pattern']:<34} | pire: {r['worst_ms']:>8.1f} ms ({r['input']}) | budget: {r['budget_ms']:g} ms | {flag}")
+
+    over = [r["pattern"] for r in rows if r["over_budget"]]
+    print(f"\n{len(over)} pattern(s) hors budget" + (": " + ", ".join(over) if over else ""))
+    return 1 if over else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
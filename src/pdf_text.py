@@ -0,0 +1,183 @@
+"""
+Cache persistant du texte des PDFs (pdfplumber), page par page.
+
+La mise en page pdfplumber est l'étape la plus lente du pipeline et 10, 10b, 10b_v14, 11 et 12
+la refaisaient chacun sur les mêmes bulletins. Ici chaque page n'est extraite qu'une fois
+dans la vie du PDF:
+- clé: SHA-256 du PDF (nom du blob raw_store) + EXTRACTOR_VERSION
+- fichier: data/cache/pdf_text/<sha>.<version>.json.gz (texte brut de page.extract_text(), compressé)
+- seules les pages demandées sont extraites; les autres s'ajoutent au cache au besoin
+
+Extraction ciblée (11, 12): iter_pages() fait d'abord une passe brute pdfminer sans analyse
+de mise en page (plusieurs fois plus rapide) pour repérer les pages qui contiennent une ancre
+("IHPC", "glissement annuel"...), puis n'extrait en pdfplumber que ces pages, une par une:
+l'appelant s'arrête au premier match accepté. Filet sans match (phrase à cheval sur deux
+pages): fallback_pages() = pages candidates (déjà en cache) + pages illisibles pour la passe
+brute, jamais la mise en page pdfplumber de tout le PDF.
+
+Les scripts gardent leur propre jointure / normalisation du texte.
+"""
+import gzip
+import json
+import os
+import re
+import threading
+from io import StringIO
+from pathlib import Path
+
+import pdfplumber
+from pdfminer.converter import TextConverter
+from pdfminer.pdfinterp import PDFPageInterpreter, PDFResourceManager
+from pdfminer.pdfpage import PDFPage
+
+import documents
+
+PDF_TEXT_CACHE_DIR = Path("data/cache/pdf_text")
+# à incrémenter si l'extraction change (paramètres extract_text, post-traitement)
+EXTRACTOR_VERSION = f"pdfplumber-{pdfplumber.__version__}.v1"
+
+# Ancres de la phrase IHPC globale (comparées sans espaces ni casse: la passe brute ne garantit pas les espaces)
+IHPC_ANCHORS = ("IHPC", "Indice Harmonisé des Prix", "glissement annuel")
+
+_docs: dict[str, dict] = {}
+_lock = threading.Lock()
+
+
+def cache_path(sha: str) -> Path:
+    return PDF_TEXT_CACHE_DIR / f"{sha}.{EXTRACTOR_VERSION}.json.gz"
+
+
+def _load(sha: str) -> dict:
+    """{"n_pages": int | None, "pages": {"<index>": texte}, "raw_pages": [texte brut] | None}"""
+    with _lock:
+        if sha in _docs:
+            return _docs[sha]
+    path = cache_path(sha)
+    if path.exists():
+        doc = json.loads(gzip.decompress(path.read_bytes()).decode("utf-8"))
+    else:
+        doc = {"n_pages": None, "pages": {}}
+    doc.setdefault("raw_pages", None)
+    with _lock:
+        return _docs.setdefault(sha, doc)
+
+
+def _save(sha: str, doc: dict):
+    path = cache_path(sha)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    tmp.write_bytes(gzip.compress(json.dumps(doc, ensure_ascii=False).encode("utf-8")))
+    tmp.replace(path)
+
+
+def page_texts(pdf_path: Path, max_pages: int | None = None) -> list[str]:
+    """
+    Texte de chaque page (page.extract_text() or ""), pages [0, max_pages) ou toutes.
+    Les pages déjà en cache ne rouvrent pas le PDF.
+    """
+    sha = documents.document_sha256(pdf_path)
+    doc = _load(sha)
+
+    n_pages = doc["n_pages"]
+    wanted = range(n_pages if max_pages is None else min(max_pages, n_pages)) if n_pages is not None else None
+    if wanted is not None and all(str(i) in doc["pages"] for i in wanted):
+        return [doc["pages"][str(i)] for i in wanted]
+
+    with pdfplumber.open(pdf_path) as pdf:
+        doc["n_pages"] = len(pdf.pages)
+        wanted = range(len(pdf.pages) if max_pages is None else min(max_pages, len(pdf.pages)))
+        for i in wanted:
+            if str(i) not in doc["pages"]:
+                doc["pages"][str(i)] = pdf.pages[i].extract_text() or ""
+    _save(sha, doc)
+    return [doc["pages"][str(i)] for i in wanted]
+
+
+def raw_page_texts(pdf_path: Path) -> list[str]:
+    """Passe brute pdfminer (laparams=None: pas d'analyse de mise en page), toutes les pages, en cache."""
+    sha = documents.document_sha256(pdf_path)
+    doc = _load(sha)
+    if doc["raw_pages"] is not None:
+        return doc["raw_pages"]
+
+    texts = []
+    rsrc = PDFResourceManager(caching=True)
+    out = StringIO()
+    device = TextConverter(rsrc, out, laparams=None)
+    interpreter = PDFPageInterpreter(rsrc, device)
+    with open(pdf_path, "rb") as f:
+        for page in PDFPage.get_pages(f):
+            interpreter.process_page(page)
+            texts.append(out.getvalue())
+            out.seek(0)
+            out.truncate()
+    device.close()
+
+    doc["raw_pages"] = texts
+    doc["n_pages"] = len(texts)
+    _save(sha, doc)
+    return texts
+
+
+def _compact(text: str) -> str:
+    return re.sub(r"\s+", "", text).lower()
+
+
+def candidate_pages(pdf_path: Path, anchors: tuple[str, ...] = IHPC_ANCHORS) -> list[int]:
+    """Index des pages dont le texte brut contient au moins une ancre."""
+    keys = [_compact(a) for a in anchors]
+    doc = _load(documents.document_sha256(pdf_path))
+    if doc["n_pages"] is not None and len(doc["pages"]) == doc["n_pages"]:
+        # PDF déjà entièrement en cache: pas besoin de la passe brute
+        texts = [doc["pages"][str(i)] for i in range(doc["n_pages"])]
+    else:
+        texts = raw_page_texts(pdf_path)
+    return [i for i, t in enumerate(texts) if any(k in _compact(t) for k in keys)]
+
+
+def iter_pages(pdf_path: Path, anchors: tuple[str, ...] = IHPC_ANCHORS):
+    """
+    (index, texte pdfplumber) des seules pages candidates, dans l'ordre, extraites à la demande.
+    Arrêter l'itération dès qu'un match est accepté évite la mise en page des pages suivantes.
+    """
+    sha = documents.document_sha256(pdf_path)
+    doc = _load(sha)
+    pdf = None
+    try:
+        for i in candidate_pages(pdf_path, anchors):
+            if str(i) not in doc["pages"]:
+                if pdf is None:
+                    pdf = pdfplumber.open(pdf_path)
+                doc["pages"][str(i)] = pdf.pages[i].extract_text() or ""
+                _save(sha, doc)
+            yield i, doc["pages"][str(i)]
+    finally:
+        if pdf is not None:
+            pdf.close()
+
+
+def pages(pdf_path: Path, indexes: list[int]) -> list[str]:
+    """Texte pdfplumber des pages `indexes` (dans cet ordre), extraites seulement si absentes du cache."""
+    sha = documents.document_sha256(pdf_path)
+    doc = _load(sha)
+    missing = [i for i in indexes if str(i) not in doc["pages"]]
+    if missing:
+        with pdfplumber.open(pdf_path) as pdf:
+            for i in missing:
+                doc["pages"][str(i)] = pdf.pages[i].extract_text() or ""
+        _save(sha, doc)
+    return [doc["pages"][str(i)] for i in indexes]
+
+
+def undecoded_pages(pdf_path: Path) -> list[int]:
+    """Pages sans texte dans la passe brute (police non décodée...): la passe brute n'y voit pas d'ancre."""
+    doc = _load(documents.document_sha256(pdf_path))
+    if doc["raw_pages"] is None and doc["n_pages"] is not None and len(doc["pages"]) == doc["n_pages"]:
+        return []  # PDF entièrement en cache pdfplumber: candidate_pages a tout vu
+    return [i for i, t in enumerate(raw_page_texts(pdf_path)) if not t.strip()]
+
+
+def fallback_pages(pdf_path: Path, anchors: tuple[str, ...] = IHPC_ANCHORS) -> list[str]:
+    """Texte des pages candidates + pages illisibles pour la passe brute, dans l'ordre du PDF."""
+    wanted = sorted(set(candidate_pages(pdf_path, anchors)) | set(undecoded_pages(pdf_path)))
+    return pages(pdf_path, wanted)
@@ -0,0 +1,144 @@
+"""
+Stockage brut adressé par contenu (SHA-256) + index "dernier fichier par source".
+
+- data/raw/blobs/ab/abcdef....html : un fichier par contenu distinct
+  (un re-téléchargement identique ne crée rien de nouveau)
+- data/raw/manifest.json : clé source -> dernier blob, date de collecte, URL
+
+Les scripts d'extraction font latest("bceao_cpm_20251203") au lieu de
+sorted(Path(...).glob("..._*.html"))[-1] sur un dossier qui grossit à chaque run.
+"""
+import fnmatch
+import hashlib
+import json
+import os
+import threading
+from datetime import datetime
+from pathlib import Path
+
+RAW_DIR = Path("data/raw")
+BLOB_DIR = RAW_DIR / "blobs"
+PARTIAL_DIR = BLOB_DIR / "partial"  # téléchargements en cours (reprise par Range)
+MANIFEST = RAW_DIR / "manifest.json"
+
+_manifest: dict | None = None
+_lock = threading.Lock()
+
+
+def _load() -> dict:
+    global _manifest
+    if _manifest is None:
+        _manifest = json.loads(MANIFEST.read_text(encoding="utf-8")) if MANIFEST.exists() else {}
+    return _manifest
+
+
+def _save():
+    MANIFEST.parent.mkdir(parents=True, exist_ok=True)
+    tmp = MANIFEST.with_suffix(".tmp")
+    tmp.write_text(json.dumps(_manifest, ensure_ascii=False, indent=1), encoding="utf-8")
+    tmp.replace(MANIFEST)
+
+
+def blob_path(sha256: str, suffix: str) -> Path:
+    return BLOB_DIR / sha256[:2] / f"{sha256}{suffix}"
+
+
+def file_sha256(path: Path, chunk_size: int = 1 << 20) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def put(key: str, body: bytes, url: str | None = None, suffix: str = "") -> tuple[Path, bool]:
+    """
+    Enregistre body sous la clé source `key`.
+    Retourne (chemin du blob, changed) ; changed=False si le contenu est identique au dernier connu.
+    """
+    sha = hashlib.sha256(body).hexdigest()
+    path = blob_path(sha, suffix)
+    if not path.exists():
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.part")
+        tmp.write_bytes(body)
+        tmp.replace(path)
+
+    return path, _record(key, sha, path, url)
+
+
+def put_file(key: str, src: Path, url: str | None = None, suffix: str = "", sha256: str | None = None) -> tuple[Path, bool]:
+    """
+    Comme put(), mais déplace un fichier déjà écrit sur disque (rename atomique, pas de copie en mémoire).
+    src est consommé: déplacé vers le blob, ou supprimé si ce contenu est déjà stocké.
+    """
+    src = Path(src)
+    sha = sha256 or file_sha256(src)
+    path = blob_path(sha, suffix)
+    if path.exists():
+        src.unlink()
+    else:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        src.replace(path)
+
+    return path, _record(key, sha, path, url)
+
+
+def _record(key: str, sha: str, path: Path, url: str | None) -> bool:
+    with _lock:
+        manifest = _load()
+        previous = manifest.get(key, {})
+        changed = previous.get("sha256") != sha
+        manifest[key] = {
+            "sha256": sha,
+            "path": str(path),
+            "url": url or previous.get("url"),
+            "fetched_at": datetime.now().isoformat(timespec="seconds") if changed else previous.get("fetched_at"),
+        }
+        _save()
+    return changed
+
+
+def entries(pattern: str) -> list[dict]:
+    """Toutes les entrées dont la clé correspond au motif fnmatch (ex: "bceao_cpm_*"), triées par clé."""
+    with _lock:
+        manifest = dict(_load())
+    return [
+        {"key": k, **v, "path": Path(v["path"])}
+        for k, v in sorted(manifest.items())
+        if fnmatch.fnmatchcase(k, pattern) and Path(v["path"]).exists()
+    ]
+
+
+def latest_entry(pattern: str, legacy_glob: str | None = None) -> dict | None:
+    """
+    Dernière entrée pour une clé (ou un motif fnmatch sur les clés, ex: "CIV_ANSTAT_IHPC_UEMOA_*").
+    Retourne {"key", "path", "sha256", "url", "fetched_at"} ou None.
+
+    legacy_glob: chemin glob des anciens fichiers horodatés, utilisé seulement si le
+    manifest ne connaît pas encore la source (données collectées avant le store).
+    """
+    with _lock:
+        manifest = _load()
+        if pattern in manifest:
+            candidates = [(pattern, manifest[pattern])]
+        else:
+            candidates = [(k, v) for k, v in manifest.items() if fnmatch.fnmatchcase(k, pattern)]
+
+    candidates = [(k, v) for k, v in candidates if Path(v["path"]).exists()]
+    if candidates:
+        # même ordre que l'ancien sorted(glob)[-1]: clé la plus grande (ex: période la plus récente)
+        key, entry = max(candidates, key=lambda kv: (kv[0], kv[1].get("fetched_at") or ""))
+        return {"key": key, **entry, "path": Path(entry["path"])}
+
+    if legacy_glob:
+        legacy = sorted(Path().glob(legacy_glob))
+        if legacy:
+            return {"key": legacy[-1].stem, "path": legacy[-1], "sha256": None, "url": None, "fetched_at": None}
+
+    return None
+
+
+def latest(pattern: str, legacy_glob: str | None = None) -> Path | None:
+    entry = latest_entry(pattern, legacy_glob)
+    return entry["path"] if entry else None
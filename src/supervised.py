@@ -0,0 +1,99 @@
+"""
+Exécution supervisée de tâches lourdes (parsing PDF): un processus par document,
+avec limite de temps et plafond mémoire.
+
+Un PDF malformé ou énorme peut bloquer pdfplumber ou consommer des Go. Dans un pool
+classique, ce document bloque tout le run. Ici:
+- chaque document tourne dans son propre processus (au plus `workers` en parallèle)
+- au-delà de DOC_TIMEOUT secondes, le processus est tué -> TimeoutError
+- l'espace d'adresses du processus est plafonné à DOC_MEMORY_MB (RLIMIT_AS, POSIX) -> MemoryError
+- un crash du processus (segfault, kill) -> RuntimeError
+Le run continue; l'appelant marque le document NEEDS AUDIT.
+
+Même contrat que fetcher.run_many: {clé: résultat | Exception}.
+func doit être une fonction de module (picklable).
+"""
+import multiprocessing
+import os
+import time
+from multiprocessing.connection import wait
+
+try:
+    import resource
+except ImportError:  # Windows: pas de plafond mémoire, seulement la limite de temps
+    resource = None
+
+DOC_TIMEOUT = float(os.environ.get("UEMOA_DOC_TIMEOUT", "120"))
+DOC_MEMORY_MB = int(os.environ.get("UEMOA_DOC_MEMORY_MB", "2048"))  # 0 = pas de plafond
+WORKERS = int(os.environ.get("UEMOA_EXTRACT_WORKERS", str(os.cpu_count() or 1)))
+
+
+def _child(conn, func, arg, memory_mb):
+    if resource is not None and memory_mb:
+        cap = memory_mb * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (cap, cap))
+    try:
+        result = func(arg)
+    except BaseException as e:
+        result = e
+    try:
+        conn.send(result)
+    except Exception as e:  # résultat non picklable
+        conn.send(RuntimeError(f"résultat non transmissible: {e!r}"))
+    conn.close()
+
+
+def _stop(proc):
+    proc.terminate()
+    proc.join(5)
+    if proc.is_alive():
+        proc.kill()
+        proc.join()
+
+
+def run_supervised(func, jobs: dict, workers: int | None = None,
+                   timeout: float | None = None, memory_mb: int | None = None) -> dict:
+    """
+    Applique func à chaque argument de jobs ({clé: argument}), un processus par job.
+    Retourne {clé: résultat | Exception} (TimeoutError, MemoryError, RuntimeError si crash).
+    """
+    workers = max(1, workers or WORKERS)
+    timeout = DOC_TIMEOUT if timeout is None else timeout
+    memory_mb = DOC_MEMORY_MB if memory_mb is None else memory_mb
+
+    pending = list(jobs.items())
+    running = {}  # clé -> (process, connexion, début)
+    results = {}
+
+    while pending or running:
+        while pending and len(running) < workers:
+            key, arg = pending.pop(0)
+            recv_conn, send_conn = multiprocessing.Pipe(duplex=False)
+            proc = multiprocessing.Process(target=_child, args=(send_conn, func, arg, memory_mb), daemon=True)
+            proc.start()
+            send_conn.close()
+            running[key] = (proc, recv_conn, time.monotonic())
+
+        # attend un résultat, une fin de processus, ou la prochaine échéance
+        now = time.monotonic()
+        next_deadline = min(start + timeout for _, _, start in running.values())
+        handles = [c for _, c, _ in running.values()] + [p.sentinel for p, _, _ in running.values()]
+        wait(handles, timeout=max(0.0, next_deadline - now))
+
+        for key, (proc, conn, start) in list(running.items()):
+            if conn.poll() or not proc.is_alive():
+                try:
+                    results[key] = conn.recv()
+                except EOFError:  # processus mort sans rien envoyer (segfault, OOM killer...)
+                    proc.join()
+                    results[key] = RuntimeError(f"worker terminé sans résultat (code {proc.exitcode})")
+                proc.join()
+            elif time.monotonic() - start > timeout:
+                _stop(proc)
+                results[key] = TimeoutError(f"délai dépassé ({timeout:g} s)")
+            else:
+                continue
+            conn.close()
+            del running[key]
+
+    return {key: results[key] for key in jobs}
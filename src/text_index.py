@@ -0,0 +1,149 @@
+"""
+Texte normalisé découpé en phrases + index inversé mot -> phrases.
+
+Les patterns IHPC (10b_v14, 11, 12) empilent des intervalles paresseux `[^.]{0,500}?`:
+lancés par finditer sur tout un bulletin, ils retentent à chaque occurrence d'"IHPC"
+et leur coût suit la longueur du document. Comme aucun de ces patterns ne traverse
+un point (sauf le point décimal d'un nombre), on peut:
+- découper le texte en phrases (point non décimal)
+- indexer les mots de chaque phrase
+- ne lancer les patterns lourds et EXCLUDE que sur les phrases qui contiennent
+  tous les mots-clés obligatoires (ex: "ihpc" ET ("baisse" OU "hausse"))
+Les matches sont les mêmes, dans le même ordre, que finditer sur le texte entier.
+
+Texte sans point (extraction PDF sans ponctuation, tableaux): une seule "phrase" = tout le
+document, l'index ne filtrerait plus rien. Une phrase de plus de MAX_SENTENCE caractères est
+donc découpée en fenêtres qui se chevauchent de MAX_MATCH caractères (plus long match
+possible des patterns IHPC, intervalles bornés): chaque fenêtre ne garde que les matches qui
+commencent avant le chevauchement suivant, un match n'est ni perdu ni compté deux fois.
+
+Benchmark: python src/text_index.py
+"""
+import re
+import time
+from collections import defaultdict
+
+# Point de fin de phrase: tout point qui n'est pas entre deux chiffres (0.6 reste entier)
+SENTENCE_END = re.compile(r"(?<!\d)\.|\.(?!\d)")
+WORD = re.compile(r"\w+")
+
+# Mots obligatoires des patterns IHPC globaux: chaque groupe = au moins un de ses mots
+# ("Indice Harmonisé ... (IHPC)" contient aussi "IHPC")
+IHPC_GROUPS = (("ihpc",), ("baisse", "hausse"))
+
+# Plus long match des patterns IHPC: sujet (~80) + intervalles {0,500} + {0,300} + {0,300} + valeur
+MAX_MATCH = 2000
+MAX_SENTENCE = 8000
+
+
+def split_sentences(text: str) -> list[str]:
+    return SENTENCE_END.split(text)
+
+
+def windows(sentence: str, size: int = MAX_SENTENCE, overlap: int = MAX_MATCH) -> list[tuple[int, int]]:
+    """(début, début du chevauchement suivant) des fenêtres de `size` caractères d'une phrase trop longue."""
+    step = size - overlap
+    spans, start = [], 0
+    while start + size < len(sentence):
+        spans.append((start, start + step))
+        start += step
+    spans.append((start, len(sentence)))
+    return spans
+
+
+class SentenceIndex:
+    def __init__(self, text: str):
+        self.sentences = []  # phrases, ou fenêtres des phrases trop longues
+        self.origin = []     # (n° de phrase, position de la fenêtre dans la phrase)
+        self.owned = []      # matches gardés s'ils commencent avant cette position (fenêtre)
+        for n, sentence in enumerate(split_sentences(text)):
+            for start, owned_end in windows(sentence):
+                self.sentences.append(sentence[start:start + MAX_SENTENCE])
+                self.origin.append((n, start))
+                self.owned.append(owned_end - start)
+        self.postings = defaultdict(set)  # mot (minuscule) -> ids de phrases
+        for i, sentence in enumerate(self.sentences):
+            for word in set(WORD.findall(sentence.lower())):
+                self.postings[word].add(i)
+
+    def lookup(self, keyword: str) -> set[int]:
+        """Phrases dont un mot contient keyword (comme une recherche de sous-chaîne, mais via le vocabulaire)."""
+        keyword = keyword.lower()
+        ids = set()
+        for word, posting in self.postings.items():
+            if keyword in word:
+                ids |= posting
+        return ids
+
+    def candidates(self, *groups: tuple[str, ...]) -> list[int]:
+        """Ids (ordre du texte) des phrases qui contiennent un mot de chaque groupe."""
+        ids = None
+        for group in groups:
+            group_ids = set().union(*(self.lookup(k) for k in group))
+            ids = group_ids if ids is None else ids & group_ids
+        return sorted(range(len(self.sentences)) if ids is None else ids)
+
+    def finditer(self, pattern: re.Pattern, *groups: tuple[str, ...]):
+        """Matches de pattern dans les seules phrases candidates, dans l'ordre du texte."""
+        last = (-1, 0)  # (phrase, fin du dernier match): pas de match chevauchant entre deux fenêtres
+        for i in self.candidates(*groups):
+            n, offset = self.origin[i]
+            for m in pattern.finditer(self.sentences[i]):
+                if m.start() >= self.owned[i]:
+                    break  # commence dans le chevauchement: trouvé entier par la fenêtre suivante
+                if (n, offset + m.start()) < last:
+                    continue
+                last = (n, offset + m.end())
+                yield m
+
+
+def _bulletin(n_blocks: int) -> str:
+    """
+    Bulletin synthétique: mentions d'IHPC avec verbes mais sans baisse/hausse (coûteuses pour
+    les intervalles paresseux), un sous-indice (faux positif), puis la phrase IHPC globale.
+    """
+    block = (
+        "L'IHPC enregistre les prix de 12 fonctions de consommation et affiche pour chaque fonction "
+        "une pondération issue des enquêtes auprès des ménages, observée sur les marchés urbains et ruraux, "
+        "puis marque les variations des produits frais, des services et des biens durables de l'Union. "
+        "La méthodologie de l'IHPC présente les relevés de 1,5 million de prix et observe les remplacements "
+        "de produits, les variétés saisonnières et les ajustements de qualité selon les normes régionales. "
+        "Les tableaux annexes détaillent les pondérations par pays, par fonction et par groupe de produits. "
+    ) * 3 + "Au Niger, l'IHPC de la fonction énergie affiche une hausse des prix des carburants de 7,1% sur un an. "
+    return block * n_blocks + "En juin 2025, l'IHPC enregistre une baisse de 0,6% en glissement annuel."
+
+
+def main():
+    import importlib
+    script = importlib.import_module("12_extract_ihpc_global_from_latest_pdf")
+    # regex brutes: le budget de GuardedPattern interromprait le finditer sur texte entier
+    pattern, exclude = script.IHPC_PATTERN.regex, script.EXCLUDE.regex
+
+    def first_accepted(matches):
+        for m in matches:
+            if not exclude.search(m.group(1)):
+                return m.group(1)
+        return None
+
+    print("\n=== BENCHMARK PATTERN IHPC: texte entier vs index de phrases ===\n")
+    print(f"{'texte':>10} | {'caractères':>12} | {'finditer (ms)':>14} | {'index (ms)':>11} | {'index µs/kcar':>13}")
+    cases = [("phrases", n, _bulletin(n)) for n in (50, 100, 200, 400, 800, 1600)]
+    # sans point: une seule phrase, découpée en fenêtres (mêmes matches, tous comparés)
+    cases += [("sans point", n, SENTENCE_END.sub(" ", _bulletin(n))) for n in (50, 200, 800)]
+    for label, n, text in cases:
+        if label == "sans point":
+            every = [m.group(1) for m in SentenceIndex(text).finditer(pattern, *IHPC_GROUPS)]
+            assert every == [m.group(1) for m in pattern.finditer(text)], label
+
+        t0 = time.perf_counter()
+        full = first_accepted(pattern.finditer(text))
+        t1 = time.perf_counter()
+        indexed = first_accepted(SentenceIndex(text).finditer(pattern, *IHPC_GROUPS))
+        t2 = time.perf_counter()
+
+        assert full == indexed, (full, indexed)
+        print(f"{label:>10} | {len(text):>12} | {(t1 - t0) * 1000:>14.1f} | {(t2 - t1) * 1000:>11.1f} | {(t2 - t1) * 1e6 / (len(text) / 1000):>13.1f}")
+
+
+if __name__ == "__main__":
+    main()